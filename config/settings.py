@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+from .database import database_config
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'operasional.profiling.ProfilingMiddleware',  # mati kecuali SOLECLEAN_PROFILING=1
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +67,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'operasional.context_processors.rbac',
             ],
         },
     },
@@ -74,14 +78,68 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Diatur lewat environment, lihat config/database.py:
+# DATABASE_URL (PostgreSQL) / SOLECLEAN_DB_PATH + SOLECLEAN_DB_PROFILE (SQLite, default WAL)
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': database_config(BASE_DIR),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Default: local-memory per proses; SOLECLEAN_CACHE_DIR = file cache yang dipakai bareng semua proses.
+# ETag / 304 & cache render (JSON analytics, halaman tracking) selalu divalidasi ke versi di DB
+# (tabel VersiData, lihat caching.py), jadi benar di backend mana pun. CACHE_SHARED cuma
+# menyalakan cache role antar request (RBAC_ROLE_CACHE_TIMEOUT di bawah).
+CACHE_SHARED = bool(os.environ.get('SOLECLEAN_CACHE_DIR'))
+
+if CACHE_SHARED:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['SOLECLEAN_CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'soleclean',
+        }
     }
+
+# Lama cache JSON analytics (detik). Invalidasi utama tetap lewat versi data.
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+
+# Halaman tracking publik (render di-cache per order, invalidasi lewat versi order)
+TRACK_CACHE_TIMEOUT = 60 * 10
+
+# Live update (SSE) dashboard & tracking. Butuh server ASGI (uvicorn/daphne: config.asgi)
+EVENTS_BACKEND = 'operasional.events.InProcessBackend'
+SSE_HEARTBEAT_SECONDS = 15
+SSE_MAX_SECONDS = 60 * 5  # koneksi ditutup berkala, browser connect ulang sendiri
+
+# Cache role (group) user antar request, detik. 0 = query sekali per request saja.
+# Default cuma nyala kalau cache-nya shared: di LocMemCache invalidasi (cabut group) cuma
+# sampai ke proses yang mengubah, proses lain masih pakai role lama sampai timeout
+RBAC_ROLE_CACHE_TIMEOUT = int(os.environ.get('SOLECLEAN_RBAC_CACHE_TIMEOUT', 60 * 60 if CACHE_SHARED else 0))
+
+# Batas request per IP: scope -> (jumlah request, per detik)
+RATE_LIMITS = {
+    'track': (60, 60),
 }
 
+# Profiling request (operasional/profiling.py): header Server-Timing, log request lambat,
+# halaman staff /profiling/. Mati = middleware dibuang waktu start, tanpa overhead
+PROFILING_ENABLED = os.environ.get('SOLECLEAN_PROFILING') == '1'
+PROFILING_SLOW_MS = int(os.environ.get('SOLECLEAN_PROFILING_SLOW_MS', 500))
+PROFILING_HISTORY = 1000  # request terakhir yang diringkas di halaman profiling (per proses)
+PROFILING_TOP_QUERIES = 5  # query terlama & grup duplikat yang ikut ditulis ke log lambat
+PROFILING_SLOW_LOG = os.environ.get('SOLECLEAN_PROFILING_LOG', os.path.join(BASE_DIR, 'logs', 'slow_requests.log'))
+PROFILING_SLOW_LOG_BYTES = 5 * 1024 * 1024  # rotasi tiap 5 MB
+PROFILING_SLOW_LOG_BACKUPS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,6 +183,14 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Kompres foto sepatu (operasional.models.compress_image)
+IMAGE_MAX_WIDTH = int(os.environ.get('SOLECLEAN_IMAGE_MAX_WIDTH', 1000))  # px
+IMAGE_JPEG_QUALITY = int(os.environ.get('SOLECLEAN_IMAGE_QUALITY', 60))
+IMAGE_MAX_PIXELS = 60_000_000  # lebih dari ini ditolak (decompression bomb), kamera HP 50 MP masih lolos
+IMAGE_SPOOL_MAX_SIZE = 2 * 1024 * 1024  # hasil JPEG > 2 MB pindah dari RAM ke temp file
+IMAGE_DERIVATIVE_WIDTHS = (64, 320, 1000)  # versi kecil WebP + JPEG buat srcset (avatar, kartu, detail)
+IMAGE_UPLOAD_WORKERS = 4  # thread buat nulis foto upload ke storage paralel (input order)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import Customer, Service, Order, OrderItem, Pengeluaran
+from .models import (
+    Customer, Service, Order, OrderItem, Pengeluaran, DailyRevenue, ImageJob,
+    ItemStatusEvent, ItemStatusHarian, TurnaroundHarian,
+)
 
 # ==========================================
 # USER MANAGEMENT (RBAC)
@@ -34,11 +37,18 @@ class OrderItemInline(admin.TabularInline):
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     # GANTI 'nama_pelanggan' & 'whatsapp' dengan method baru di bawah
-    list_display = ('id', 'get_customer_nama', 'get_customer_wa', 'status', 'tanggal_masuk')
+    list_display = ('id', 'get_customer_nama', 'get_customer_wa', 'status', 'jumlah_item', 'total_harga', 'tanggal_masuk')
+    list_select_related = ('customer',)
     list_filter = ('status', 'tanggal_masuk')
     search_fields = ('customer__nama', 'customer__whatsapp') # Bisa search by nama customer
     inlines = [OrderItemInline]
 
+    def save_formset(self, request, form, formset, change):
+        # Ganti status item dari inline -> ItemStatusEvent tahu siapa yang mengubah
+        for item_form in formset.forms:
+            item_form.instance._diubah_oleh = request.user
+        super().save_formset(request, form, formset, change)
+
     # Teknik buat nampilin field dari tabel tetangga (Customer)
     @admin.display(description='Nama Pelanggan')
     def get_customer_nama(self, obj):
@@ -55,6 +65,81 @@ class PengeluaranAdmin(admin.ModelAdmin):
     list_filter = ('tanggal', 'kategori')
     search_fields = ('nama_pengeluaran', 'sub_kategori')
 
-# 4. Sisanya Tetap
-admin.site.register(Service)
-admin.site.register(OrderItem)
\ No newline at end of file
+# 4. Rollup Omzet Harian (read-only, diisi otomatis / rebuild_rollups)
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(admin.ModelAdmin):
+    list_display = ('tanggal', 'metode_pembayaran', 'omzet', 'jumlah_order', 'jumlah_item')
+    list_filter = ('metode_pembayaran',)
+    date_hierarchy = 'tanggal'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+# 5. Antrian Kompres Foto (diisi otomatis, dikerjakan process_images)
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'item', 'field', 'status', 'attempts', 'available_at', 'last_error')
+    list_filter = ('status', 'field')
+    list_select_related = ('item__service',)
+    readonly_fields = [f.name for f in ImageJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+# 6. Log Status Item + Rollup Metrik (append-only / diisi otomatis)
+@admin.register(ItemStatusEvent)
+class ItemStatusEventAdmin(admin.ModelAdmin):
+    list_display = ('waktu', 'item', 'status_lama', 'status_baru', 'oleh', 'durasi_detik', 'turnaround_detik')
+    list_filter = ('status_baru',)
+    list_select_related = ('item__service', 'oleh')
+    date_hierarchy = 'waktu'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ItemStatusHarian)
+class ItemStatusHarianAdmin(admin.ModelAdmin):
+    list_display = ('tanggal', 'service', 'status_lama', 'status_baru', 'teknisi', 'jumlah', 'total_durasi_detik')
+    list_filter = ('status_baru', 'service')
+    list_select_related = ('service',)
+    date_hierarchy = 'tanggal'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(TurnaroundHarian)
+class TurnaroundHarianAdmin(admin.ModelAdmin):
+    list_display = ('tanggal', 'service', 'bucket', 'jumlah', 'total_detik')
+    list_filter = ('service',)
+    list_select_related = ('service',)
+    date_hierarchy = 'tanggal'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+# 7. Sisanya Tetap
+@admin.register(OrderItem)
+class OrderItemAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        obj._diubah_oleh = request.user
+        super().save_model(request, obj, form, change)
+
+admin.site.register(Service)
\ No newline at end of file
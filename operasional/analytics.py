@@ -0,0 +1,335 @@
+"""
+Mesin analytics bersama untuk halaman `analytics` dan endpoint `api_analytics_data`.
+
+Semua hitungan keuangan ada di sini, view cuma tinggal memanggil:
+- resolve_date_range(): ubah ?filter= / start_date / end_date jadi rentang tanggal
+- revenue_kpis(): omzet total + cash/transfer/unpaid (1 query ke rollup DailyRevenue)
+- expense_summary(): total pengeluaran + breakdown kategori (1 query)
+- turnaround_summary(): persentil turnaround, lama per status & throughput teknisi
+  (cuma baca rollup ItemStatusHarian / TurnaroundHarian, 3 query)
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    TURNAROUND_BUCKETS_JAM, DailyRevenue, ItemStatusHarian, OrderItem, Pengeluaran, TurnaroundHarian,
+)
+
+
+# ==========================================
+# 1. RENTANG TANGGAL
+# ==========================================
+def resolve_date_range(filter_type, custom_start=None, custom_end=None, today=None):
+    """
+    Return dict rentang tanggal untuk filter analytics.
+    start_date / end_date = rentang setengah terbuka [start, end), None untuk 'all'.
+    Raise ValueError kalau filter gak dikenal atau format tanggal custom salah.
+    """
+    today = today or timezone.localdate()
+
+    if filter_type == 'today':
+        start_date = today
+        end_date = today + timedelta(days=1)
+        filter_label = 'Hari Ini'
+    elif filter_type == 'week':
+        start_date = today - timedelta(days=today.weekday())
+        end_date = start_date + timedelta(days=7)
+        filter_label = 'Minggu Ini'
+    elif filter_type == 'month':
+        start_date = today.replace(day=1)
+        if today.month == 12:
+            end_date = today.replace(year=today.year+1, month=1, day=1)
+        else:
+            end_date = today.replace(month=today.month+1, day=1)
+        filter_label = f'Bulan {today.strftime("%B %Y")}'
+    elif filter_type == 'custom' and custom_start and custom_end:
+        try:
+            start_date = datetime.strptime(custom_start, '%Y-%m-%d').date()
+            end_date = datetime.strptime(custom_end, '%Y-%m-%d').date() + timedelta(days=1)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid date format')
+        filter_label = f'Rentang {start_date.strftime("%d %b %Y")} - {(end_date - timedelta(days=1)).strftime("%d %b %Y")}'
+    elif filter_type == 'all':
+        start_date = None
+        end_date = None
+        filter_label = 'Semua Data'
+    else:
+        raise ValueError('Invalid filter')
+
+    if start_date:
+        # Grafik & date picker ikut rentang filter (end inklusif)
+        chart_start_date = start_date
+        chart_end_date = end_date - timedelta(days=1)
+        display_start_date = start_date.strftime('%Y-%m-%d')
+        display_end_date = chart_end_date.strftime('%Y-%m-%d')
+    else:
+        # 'all': grafik cukup 7 hari terakhir
+        chart_start_date = today - timedelta(days=7)
+        chart_end_date = today
+        display_start_date = today.strftime('%Y-%m-%d')
+        display_end_date = today.strftime('%Y-%m-%d')
+
+    return {
+        'filter_type': filter_type,
+        'filter_label': filter_label,
+        'start_date': start_date,
+        'end_date': end_date,
+        'chart_start_date': chart_start_date,
+        'chart_end_date': chart_end_date,
+        'display_start_date': display_start_date,
+        'display_end_date': display_end_date,
+    }
+
+
+# ==========================================
+# 2. QUERYSET DASAR
+# ==========================================
+def datetime_bounds(start_date, end_date):
+    """
+    Ubah rentang tanggal lokal [start, end) jadi batas datetime aware.
+    Filter `kolom__gte` / `kolom__lt` ke datetime bisa pakai index,
+    beda dengan `kolom__date__...` yang membungkus kolom pakai fungsi.
+    """
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start_date, time.min), tz),
+        timezone.make_aware(datetime.combine(end_date, time.min), tz),
+    )
+
+
+def revenue_queryset(start_date=None, end_date=None):
+    rollup = DailyRevenue.objects.all()
+    if start_date and end_date:
+        rollup = rollup.filter(tanggal__gte=start_date, tanggal__lt=end_date)
+    return rollup
+
+
+def expense_queryset(start_date=None, end_date=None):
+    expenses = Pengeluaran.objects.all()
+    if start_date and end_date:
+        mulai, sampai = datetime_bounds(start_date, end_date)
+        expenses = expenses.filter(tanggal__gte=mulai, tanggal__lt=sampai)
+    return expenses
+
+
+# ==========================================
+# 3. KPI
+# ==========================================
+def revenue_kpis(start_date=None, end_date=None):
+    """Omzet total & per metode bayar, 1 query (conditional aggregation)"""
+    totals = revenue_queryset(start_date, end_date).aggregate(
+        total_omzet=Sum('omzet'),
+        duit_cash=Sum('omzet', filter=Q(metode_pembayaran='CASH')),
+        duit_transfer=Sum('omzet', filter=Q(metode_pembayaran='TRANSFER')),
+        duit_unpaid=Sum('omzet', filter=Q(metode_pembayaran='UNPAID')),
+    )
+    return {key: int(value or 0) for key, value in totals.items()}
+
+
+def expense_summary(start_date=None, end_date=None):
+    """Total pengeluaran + breakdown per kategori, 1 query GROUP BY kategori"""
+    breakdown = list(
+        expense_queryset(start_date, end_date)
+        .values('kategori').annotate(total=Sum('biaya')).order_by('-total')
+    )
+    return {
+        'total_pengeluaran': int(sum(item['total'] or 0 for item in breakdown)),
+        'kategori_labels': [item['kategori'] for item in breakdown],
+        'kategori_values': [int(item['total']) if item['total'] else 0 for item in breakdown],
+    }
+
+
+def financial_summary(start_date=None, end_date=None):
+    """KPI kartu atas: omzet, pengeluaran, laba bersih (total 2 query)"""
+    summary = revenue_kpis(start_date, end_date)
+    summary.update(expense_summary(start_date, end_date))
+    summary['laba_bersih'] = summary['total_omzet'] - summary['total_pengeluaran']
+    return summary
+
+
+# ==========================================
+# 4. DETAIL TAMBAHAN (Halaman Analytics)
+# ==========================================
+def sub_kategori_breakdown(start_date=None, end_date=None):
+    """Pengeluaran per sub kategori (yang diisi saja) + rata-rata per pembelian"""
+    rows = expense_queryset(start_date, end_date).exclude(
+        Q(sub_kategori__isnull=True) | Q(sub_kategori='')
+    ).values('sub_kategori').annotate(
+        total=Sum('biaya'),
+        count=Count('id')
+    ).order_by('-count')
+    result = []
+    for item in rows:
+        item['average'] = int(item['total'] / item['count']) if item['count'] > 0 else 0
+        result.append(item)
+    return result
+
+
+def top_services(start_date=None, end_date=None, limit=5):
+    items = OrderItem.objects.filter(order__status='COMPLETED')
+    if start_date and end_date:
+        mulai, sampai = datetime_bounds(start_date, end_date)
+        items = items.filter(order__tanggal_selesai__gte=mulai, order__tanggal_selesai__lt=sampai)
+    return items.values('service__nama').annotate(
+        count=Count('id'),
+        total_revenue=Sum('harga_saat_order')
+    ).order_by('-count')[:limit]
+
+
+def daily_series(date_range):
+    """Seri harian grafik: 1 query GROUP BY di rollup, hari kosong = 0"""
+    series = DailyRevenue.series(date_range['chart_start_date'], date_range['chart_end_date'])
+    for day in series:
+        day['label'] = day['tanggal'].strftime('%d %b')
+        day['tanggal_format'] = day['tanggal'].strftime('%A, %d %B %Y')
+    return series
+
+
+def expense_history(start_date=None, end_date=None, limit=5):
+    return expense_queryset(start_date, end_date).order_by('-tanggal')[:limit]
+
+
+# ==========================================
+# 5. PAYLOAD JSON (api_analytics_data)
+# ==========================================
+def api_payload(date_range):
+    start_date, end_date = date_range['start_date'], date_range['end_date']
+    summary = financial_summary(start_date, end_date)
+    series = daily_series(date_range)
+
+    return {
+        'status': 'success',
+        'kpi': {
+            'total_omzet': summary['total_omzet'],
+            'total_pengeluaran': summary['total_pengeluaran'],
+            'laba_bersih': summary['laba_bersih'],
+            'duit_cash': summary['duit_cash'],
+            'duit_transfer': summary['duit_transfer'],
+            'duit_unpaid': summary['duit_unpaid'],
+        },
+        'charts': {
+            'daily_labels': [day['label'] for day in series],
+            'daily_omzet': [day['omzet'] for day in series],
+            'kategori_labels': summary['kategori_labels'],
+            'kategori_values': summary['kategori_values'],
+        },
+        'expense_history': [
+            {
+                'tanggal': expense.tanggal.strftime('%d %b'),
+                'nama': expense.nama_pengeluaran,
+                'sub_kategori': expense.sub_kategori or '',
+                'kategori_display': expense.get_kategori_display(),
+                'biaya': int(expense.biaya),
+            }
+            for expense in expense_history(start_date, end_date)
+        ],
+    }
+
+
+# ==========================================
+# 6. METRIK PENGERJAAN (rollup log status item)
+# ==========================================
+TURNAROUND_PERCENTILES = (50, 90, 95)
+
+
+def _rollup_range(queryset, start_date=None, end_date=None):
+    if start_date and end_date:
+        queryset = queryset.filter(tanggal__gte=start_date, tanggal__lt=end_date)
+    return queryset
+
+
+def percentile_histogram(buckets, persen):
+    """
+    Estimasi persentil (jam) dari histogram {index bucket: jumlah}, interpolasi linear
+    di dalam bucket. Bucket terakhir gak punya batas atas -> dikembalikan batas bawahnya.
+    """
+    total = sum(buckets.values())
+    if not total:
+        return None
+    target = total * persen / 100
+    kumulatif = 0
+    for index in sorted(buckets):
+        jumlah = buckets[index]
+        if kumulatif + jumlah >= target:
+            bawah = TURNAROUND_BUCKETS_JAM[index - 1] if index else 0
+            if index >= len(TURNAROUND_BUCKETS_JAM):
+                return float(bawah)
+            atas = TURNAROUND_BUCKETS_JAM[index]
+            return round(bawah + (atas - bawah) * (target - kumulatif) / jumlah, 1)
+        kumulatif += jumlah
+    return None
+
+
+def turnaround_percentiles(start_date=None, end_date=None):
+    """Turnaround order masuk -> item selesai per service + semua service, 1 query GROUP BY"""
+    rows = (
+        _rollup_range(TurnaroundHarian.objects.all(), start_date, end_date)
+        .values('service__nama', 'bucket')
+        .annotate(jumlah_total=Sum('jumlah'), detik_total=Sum('total_detik'))
+        .order_by()
+    )
+    per_service = {}
+    semua = {'nama': 'Semua Service', 'buckets': {}, 'jumlah': 0, 'detik': 0}
+    for row in rows:
+        service = per_service.setdefault(
+            row['service__nama'], {'nama': row['service__nama'], 'buckets': {}, 'jumlah': 0, 'detik': 0}
+        )
+        for target in (service, semua):
+            target['buckets'][row['bucket']] = target['buckets'].get(row['bucket'], 0) + row['jumlah_total']
+            target['jumlah'] += row['jumlah_total']
+            target['detik'] += row['detik_total']
+
+    hasil = []
+    for data in sorted(per_service.values(), key=lambda d: -d['jumlah']) + ([semua] if per_service else []):
+        hasil.append({
+            'service': data['nama'],
+            'jumlah': data['jumlah'],
+            'rata_jam': round(data['detik'] / data['jumlah'] / 3600, 1),
+            **{f'p{p}': percentile_histogram(data['buckets'], p) for p in TURNAROUND_PERCENTILES},
+        })
+    return hasil
+
+
+def status_dwell(start_date=None, end_date=None):
+    """Rata-rata lama item di tiap status (jam) per service, 1 query GROUP BY"""
+    rows = (
+        _rollup_range(ItemStatusHarian.objects.all(), start_date, end_date)
+        .values('service__nama', 'status_lama')
+        .annotate(jumlah_total=Sum('jumlah'), detik_total=Sum('total_durasi_detik'))
+        .order_by('service__nama', 'status_lama')
+    )
+    label = dict(OrderItem.STATUS_CHOICES)
+    return [
+        {
+            'service': row['service__nama'],
+            'status': row['status_lama'],
+            'status_label': label.get(row['status_lama'], row['status_lama']),
+            'jumlah': row['jumlah_total'],
+            'rata_jam': round(row['detik_total'] / row['jumlah_total'] / 3600, 1) if row['jumlah_total'] else 0,
+        }
+        for row in rows
+    ]
+
+
+def teknisi_throughput(start_date=None, end_date=None):
+    """Jumlah item yang ditandai READY per teknisi per hari, 1 query GROUP BY"""
+    rows = (
+        _rollup_range(ItemStatusHarian.objects.filter(status_baru='READY'), start_date, end_date)
+        .values('tanggal', 'teknisi')
+        .annotate(jumlah_total=Sum('jumlah'))
+        .order_by('-tanggal', '-jumlah_total')
+    )
+    return [
+        {'tanggal': row['tanggal'].isoformat(), 'teknisi': row['teknisi'] or '-', 'jumlah': row['jumlah_total']}
+        for row in rows
+    ]
+
+
+def turnaround_summary(start_date=None, end_date=None):
+    return {
+        'turnaround': turnaround_percentiles(start_date, end_date),
+        'status_dwell': status_dwell(start_date, end_date),
+        'throughput': teknisi_throughput(start_date, end_date),
+    }
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OperasionalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'operasional'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (daftarin receiver invalidasi cache)
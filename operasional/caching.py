@@ -0,0 +1,78 @@
+import time
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+# ==========================================
+# VERSI DATA GLOBAL (buat invalidasi cache)
+# ==========================================
+# Semua cache turunan data operasional (mis. JSON analytics) menyelipkan versi ini
+# di key-nya. Tiap ada Order / OrderItem / Pengeluaran berubah, versinya dinaikkan
+# (lihat signals.py), jadi entry lama otomatis gak kepakai lagi & expire sendiri.
+# Versinya disimpan di DB (tabel VersiData), bukan di cache: semua worker baca angka yang
+# sama, jadi LocMemCache per proses pun gak pernah kasih payload / 304 yang basi.
+DATA_VERSION_KEY = 'data'
+
+
+def _versi_baru(queryset):
+    """Naikkan versi baris yang ada: waktu sekarang, minimal +1 (jam server mundur pun tetap naik)"""
+    return queryset.update(versi=Greatest(F('versi') + 1, Value(time.time_ns())))
+
+
+def data_version():
+    """Versi data saat ini (1 query). Baris belum ada -> dibuat, mulai dari waktu sekarang"""
+    from .models import VersiData
+
+    versi = VersiData.objects.filter(pk=DATA_VERSION_KEY).values_list('versi', flat=True).first()
+    if versi is None:
+        versi = VersiData.objects.get_or_create(pk=DATA_VERSION_KEY, defaults={'versi': time.time_ns()})[0].versi
+    return versi
+
+
+def bump_data_version():
+    # Baris belum ada = belum pernah dibaca, nanti dibuat data_version() dengan waktu yang lebih baru
+    from .models import VersiData
+
+    _versi_baru(VersiData.objects.filter(pk=DATA_VERSION_KEY))
+
+
+# ==========================================
+# VERSI PER ORDER (buat halaman tracking publik)
+# ==========================================
+# Nilainya = waktu (time_ns) perubahan terakhir order / item-nya, dipakai buat
+# ETag, Last-Modified, dan key cache halaman tracking. Disimpan di VersiData (bukan kolom
+# Order) biar update status item tetap cukup 1 UPDATE item + 1 UPDATE versi setelah commit,
+# dan sama di semua proses (server web, worker process_images) apa pun backend cache-nya.
+# Baris cuma dibuat buat order yang ada (dicek dulu di DB), jadi id acak dari pengunjung
+# gak ngisi tabel, dan dihapus lagi waktu order-nya dihapus.
+def _order_version_key(order_id):
+    return f'order:{order_id}'
+
+
+def order_version(order_id):
+    """Versi order, None kalau barisnya belum ada (belum pernah dibuka / order gak ada)"""
+    from .models import VersiData
+
+    return VersiData.objects.filter(pk=_order_version_key(order_id)).values_list('versi', flat=True).first()
+
+
+def init_order_version(order_id):
+    """Buat baris versi order yang sudah dipastikan ada di DB, return versinya"""
+    from .models import VersiData
+
+    return VersiData.objects.get_or_create(
+        pk=_order_version_key(order_id), defaults={'versi': time.time_ns()}
+    )[0].versi
+
+
+def bump_order_version(*order_ids):
+    """Naikkan versi order-order ini (1 UPDATE). Yang belum punya baris dilewati, dibuat waktu dibuka"""
+    from .models import VersiData
+
+    _versi_baru(VersiData.objects.filter(pk__in=[_order_version_key(order_id) for order_id in order_ids]))
+
+
+def delete_order_version(order_id):
+    from .models import VersiData
+
+    VersiData.objects.filter(pk=_order_version_key(order_id)).delete()
@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .roles import can_add_order, is_admin, is_supervisor, is_teknisi, user_roles
+
+
+def rbac(request):
+    """Role user buat template (lazy: baru dihitung kalau dipakai, maksimal 1x per request)"""
+    user = request.user
+    return {
+        'user_roles': SimpleLazyObject(lambda: sorted(user_roles(user))),
+        'is_admin': SimpleLazyObject(lambda: is_admin(user)),
+        'is_supervisor': SimpleLazyObject(lambda: is_supervisor(user)),
+        'is_teknisi': SimpleLazyObject(lambda: is_teknisi(user)),
+        'can_add_order': SimpleLazyObject(lambda: can_add_order(user)),
+    }
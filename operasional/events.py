@@ -0,0 +1,92 @@
+"""
+Event live (Server-Sent Events) buat dashboard & halaman tracking.
+
+Alurnya:
+- signals.py: tiap Order / OrderItem disimpan -> publish() setelah transaksi commit
+- views.dashboard_events / track_order_events (async, ASGI) -> subscribe() ke channel,
+  kirim event ke browser, browser cuma update kartu / item yang berubah
+
+Channel: 'dashboard' (semua order) dan 'order:<id>' (halaman tracking 1 order).
+Backend default InProcessBackend = fan-out di memori 1 proses (cukup buat 1 worker ASGI
+& test). Kalau server jalan >1 worker, set EVENTS_BACKEND ke backend lain dengan
+method yang sama (subscribe / unsubscribe / publish), mis. pakai Redis pub/sub.
+"""
+import asyncio
+import json
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class InProcessBackend:
+    """Fan-out antar koneksi SSE di proses yang sama, aman dipanggil dari thread mana saja"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = {}  # queue -> (event loop pemilik queue, set channel)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        """Daftar ke channel, return asyncio.Queue. Wajib dipanggil dari dalam event loop"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = (asyncio.get_running_loop(), set(channels))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def publish(self, channels, event):
+        with self._lock:
+            targets = [
+                (loop, queue) for queue, (loop, subscribed) in self._subscribers.items()
+                if subscribed.intersection(channels)
+            ]
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(_put_nowait, queue, event)
+            except RuntimeError:
+                # Loop koneksi itu sudah ditutup, nanti unsubscribe sendiri
+                pass
+
+
+def _put_nowait(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # Client lambat: event dibuang, client tetap bisa reload manual
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.EVENTS_BACKEND)()
+
+
+def publish(event_type, order_id, **data):
+    """Kirim event ke dashboard & halaman tracking order itu"""
+    event = dict(data, type=event_type, order_id=order_id)
+    get_backend().publish({'dashboard', f'order:{order_id}'}, event)
+
+
+async def stream(channels):
+    """Async generator teks SSE: event + ping berkala, berhenti setelah SSE_MAX_SECONDS"""
+    backend = get_backend()
+    queue = backend.subscribe(channels)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SSE_MAX_SECONDS
+    try:
+        # Browser otomatis connect ulang 3 detik setelah stream ditutup
+        yield 'retry: 3000\n\n'
+        while loop.time() < deadline:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'  # jaga koneksi biar gak diputus proxy
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        backend.unsubscribe(queue)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from operasional.models import OrderItem, buat_turunan, hapus_turunan
+
+class Command(BaseCommand):
+    help = 'Buat versi kecil (WebP/JPEG buat srcset) untuk foto sepatu lama yang belum punya'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Buat ulang walaupun turunan sudah ada')
+
+    def handle(self, *args, **options):
+        # Foto yang masih antri kompres dibiarkan, worker process_images yang buat turunannya
+        items = OrderItem.objects.exclude(foto_status='PENDING').filter(
+            ~Q(foto_sebelum='') | Q(foto_sesudah__isnull=False) & ~Q(foto_sesudah='')
+        ).only('id', 'foto_sebelum', 'foto_sesudah', 'foto_turunan')
+
+        dibuat = gagal = 0
+        for item in items.iterator(chunk_size=200):
+            for field in ('foto_sebelum', 'foto_sesudah'):
+                foto = getattr(item, field)
+                if not foto or (item.turunan(field) and not options['force']):
+                    continue
+                try:
+                    data = buat_turunan(foto)
+                except Exception as exc:
+                    gagal += 1
+                    self.stderr.write(f'⚠️ Item #{item.id} {field}: {type(exc).__name__}: {exc}')
+                    continue
+                hapus_turunan(foto.storage, OrderItem.simpan_turunan(item.id, field, data))
+                dibuat += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Turunan foto dibuat: {dibuat} foto, {gagal} gagal'))
@@ -0,0 +1,212 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment
+from django.urls import reverse
+
+from operasional.models import Customer, Order
+from operasional.synthetic import generate, parse_status_mix
+
+
+def view_targets():
+    """(nama, url, login?) view yang diukur. Order contoh = order aktif terbaru & order lunas terbaru"""
+    aktif = Order.objects.exclude(status='COMPLETED').order_by('-tanggal_masuk').first()
+    lunas = Order.objects.filter(status='COMPLETED').order_by('-tanggal_selesai').first()
+    contoh = aktif or lunas
+    pelanggan = Customer.objects.order_by('id').first()
+    return [
+        ('dashboard', reverse('dashboard'), True),
+        ('dashboard_overdue', reverse('dashboard') + '?lane=OVERDUE', True),
+        ('detail_order', reverse('detail_order', args=[contoh.pk]), True),
+        ('analytics_all', reverse('analytics') + '?filter=all', True),
+        ('analytics_month', reverse('analytics') + '?filter=month', True),
+        ('api_analytics_data', reverse('api_analytics_data') + '?filter=month', True),
+        ('api_turnaround_data', reverse('api_turnaround_data') + '?filter=all', True),
+        ('track_order', reverse('track_order', args=[contoh.pk]), False),
+        ('cetak_struk', reverse('cetak_struk', args=[(lunas or contoh).pk]), True),
+        ('api_customer_search', reverse('api_customer_search') + f'?q={pelanggan.nama[:3]}', True),
+    ]
+
+
+class TimerSQL:
+    """execute_wrapper: total waktu SQL presisi tinggi (waktu di connection.queries dibulatkan ke ms)"""
+    def __init__(self):
+        self.detik = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        mulai = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.detik += time.perf_counter() - mulai
+
+
+def ukur(client, url, repeat, dingin):
+    """Jalankan view `repeat` kali. dingin=True -> cache dikosongkan tiap kali (render penuh)"""
+    wall, sql, jumlah_query, status = [], [], [], None
+    for _ in range(repeat):
+        if dingin:
+            cache.clear()
+        timer = TimerSQL()
+        with CaptureQueriesContext(connection) as queries, connection.execute_wrapper(timer):
+            mulai = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            wall.append((time.perf_counter() - mulai) * 1000)
+        status = response.status_code
+        jumlah_query.append(len(queries))
+        sql.append(timer.detik * 1000)
+    return {
+        'status': status,
+        'wall_ms_median': round(statistics.median(wall), 2),
+        'wall_ms_min': round(min(wall), 2),
+        'queries': max(jumlah_query),
+        'sql_ms_median': round(statistics.median(sql), 2),
+    }
+
+
+def jalankan_worker(options, media_root):
+    setup_test_environment()  # ALLOWED_HOSTS 'testserver' buat test client
+    call_command('migrate', verbosity=0)
+
+    with override_settings(MEDIA_ROOT=media_root):
+        mulai = time.perf_counter()
+        ringkasan = generate(
+            customers=options['customers'], orders=options['orders'],
+            items_per_order=(options['min_items'], options['max_items']),
+            expenses=options['expenses'], years=options['years'],
+            status_mix=parse_status_mix(options['status_mix']),
+            images=options['images'], seed=options['seed'],
+        )
+        ringkasan['seed_seconds'] = round(time.perf_counter() - mulai, 2)
+
+        user = User.objects.create_superuser('bench', password='bench')
+        for nama in ('Admin', 'Supervisor', 'Teknisi'):
+            user.groups.add(Group.objects.get_or_create(name=nama)[0])
+        client = Client()
+        client.force_login(user)
+        anonim = Client()
+
+        views = []
+        for nama, url, login in view_targets():
+            c = client if login else anonim
+            c.get(url)  # pemanasan (import template, compile regex, dll)
+            views.append({
+                'view': nama,
+                'url': url,
+                'dingin': ukur(c, url, options['repeat'], dingin=True),
+                'hangat': ukur(c, url, options['repeat'], dingin=False),
+            })
+    return {'data': ringkasan, 'views': views}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark view utama di atas data sintetis (database & media sementara, offline): '
+        'wall time, jumlah query & waktu SQL per view, hasil JSON bisa dibandingkan antar commit'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--min-items', type=int, default=1)
+        parser.add_argument('--max-items', type=int, default=3)
+        parser.add_argument('--expenses', type=int, default=1000)
+        parser.add_argument('--years', type=int, default=2, help='Rentang tanggal data (tahun ke belakang)')
+        parser.add_argument('--status-mix', default='', help='Bobot status order, mis. PENDING=5,PROCESS=5,READY=5,COMPLETED=85')
+        parser.add_argument('--images', type=int, default=6, help='Jumlah foto sintetis (dipakai bergantian)')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', default='bench_result.json', help='File hasil JSON')
+        parser.add_argument('--compare', help='File JSON hasil sebelumnya, tampilkan selisihnya')
+        parser.add_argument('--worker', action='store_true', help='(internal) jalankan di proses ini')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(jalankan_worker(options, os.environ['SOLECLEAN_BENCH_MEDIA'])))
+            return
+
+        try:
+            parse_status_mix(options['status_mix'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        argumen = [
+            f"--{nama.replace('_', '-')}={options[nama]}"
+            for nama in ('customers', 'orders', 'min_items', 'max_items', 'expenses', 'years',
+                         'status_mix', 'images', 'repeat', 'seed')
+        ]
+        with tempfile.TemporaryDirectory() as folder:
+            # Proses terpisah: DB SQLite & MEDIA_ROOT sementara, database asli gak disentuh
+            env = dict(os.environ, SOLECLEAN_DB_PATH=os.path.join(folder, 'bench.sqlite3'),
+                       SOLECLEAN_BENCH_MEDIA=os.path.join(folder, 'media'))
+            env.pop('DATABASE_URL', None)
+            env['DJANGO_SETTINGS_MODULE'] = settings.SETTINGS_MODULE  # juga kalau dipanggil lewat django-admin --settings
+            proses = subprocess.run(
+                [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench', '--worker', *argumen],
+                env=env, capture_output=True, text=True,
+            )
+        if proses.returncode:
+            self.stderr.write(proses.stderr)
+            raise CommandError('Worker benchmark gagal')
+        hasil = json.loads(proses.stdout.strip().splitlines()[-1])
+
+        hasil['meta'] = {
+            'commit': git_commit(),
+            'waktu': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'db_profile': os.environ.get('SOLECLEAN_DB_PROFILE', 'wal'),
+            'argumen': argumen,
+        }
+        pembanding = {}
+        if options['compare']:
+            with open(options['compare']) as f:
+                pembanding = {row['view']: row for row in json.load(f)['views']}
+
+        data = hasil['data']
+        self.stdout.write(
+            f"Data: {data['orders']} order ({data['active_orders']} aktif), {data['items']} item, "
+            f"{data['customers']} pelanggan, {data['expenses']} pengeluaran — seed {data['seed_seconds']} s"
+        )
+        self.stdout.write(f"{'view':<22} {'dingin ms':>10} {'query':>6} {'sql ms':>8}   {'hangat ms':>10} {'query':>6}")
+        for row in hasil['views']:
+            dingin, hangat = row['dingin'], row['hangat']
+            baris = (
+                f"{row['view']:<22} {dingin['wall_ms_median']:>10.1f} {dingin['queries']:>6} "
+                f"{dingin['sql_ms_median']:>8.1f}   {hangat['wall_ms_median']:>10.1f} {hangat['queries']:>6}"
+            )
+            lama = pembanding.get(row['view'])
+            if lama:
+                selisih = dingin['wall_ms_median'] - lama['dingin']['wall_ms_median']
+                baris += f"   Δ {selisih:+.1f} ms, {dingin['queries'] - lama['dingin']['queries']:+d} query"
+            self.stdout.write(baris)
+
+        with open(options['output'], 'w') as f:
+            json.dump(hasil, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"✅ Hasil disimpan ke {options['output']}"))
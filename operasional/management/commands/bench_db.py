@@ -0,0 +1,191 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from config.database import SQLITE_PROFILES
+from operasional import analytics as engine
+from operasional.models import Customer, Order, OrderItem, Service
+
+
+def persentil(nilai, persen):
+    if not nilai:
+        return None
+    urut = sorted(nilai)
+    return urut[min(int(len(urut) * persen / 100), len(urut) - 1)]
+
+
+def siapkan_data(jumlah_order, rng):
+    """Data awal: pelanggan, service, order + item (tanpa foto asli)"""
+    services = Service.objects.bulk_create(
+        Service(nama=f'Service {i}', harga=25000 + 5000 * i, durasi_hari=1 + i % 3) for i in range(5)
+    )
+    customers = Customer.objects.bulk_create(
+        Customer(nama=f'Pelanggan {i}', whatsapp=f'0812{i:08d}') for i in range(200)
+    )
+    for _ in range(jumlah_order):
+        order = Order.objects.create(
+            customer=rng.choice(customers),
+            tanggal_masuk=timezone.now() - timezone.timedelta(days=rng.randint(0, 30)),
+        )
+        OrderItem.objects.create(
+            order=order, service=rng.choice(services), merk_sepatu='Nike', warna='Putih',
+            foto_sebelum='foto_sepatu/before/bench.jpg',
+        )
+    return [s.pk for s in services], [c.pk for c in customers]
+
+
+# ==========================================
+# OPERASI (1 operasi = kira-kira 1 request)
+# ==========================================
+def tulis_order(rng, service_ids, customer_ids):
+    """Kasir input order baru (2 item)"""
+    with transaction.atomic():
+        order = Order.objects.create(customer_id=rng.choice(customer_ids))
+        for _ in range(2):
+            OrderItem.objects.create(
+                order=order, service_id=rng.choice(service_ids), merk_sepatu='Adidas', warna='Hitam',
+                foto_sebelum='foto_sepatu/before/bench.jpg',
+            )
+
+
+def ubah_status(rng, service_ids, customer_ids):
+    """Teknisi geser status beberapa sepatu"""
+    ids = list(OrderItem.objects.filter(status__in=['PENDING', 'PROCESS']).values_list('pk', flat=True)[:50])
+    if ids:
+        OrderItem.objects.filter(pk__in=rng.sample(ids, min(3, len(ids)))).ubah_status(rng.choice(['PROCESS', 'READY']))
+
+
+def baca_analytics(rng, service_ids, customer_ids):
+    """Supervisor buka analytics: KPI + breakdown + grafik"""
+    date_range = engine.resolve_date_range('month')
+    engine.financial_summary(date_range['start_date'], date_range['end_date'])
+    engine.daily_series(date_range)
+    list(engine.top_services(date_range['start_date'], date_range['end_date']))
+
+
+def baca_dashboard(rng, service_ids, customer_ids):
+    list(Order.objects.active_queue().prefetch_related('items__service')[:24])
+
+
+OPERASI_TULIS = [tulis_order, ubah_status]
+OPERASI_BACA = [baca_analytics, baca_dashboard]
+
+
+def jalankan_worker(options):
+    """Jalan di proses anak dengan profil DB dari environment, hasil JSON ke stdout"""
+    rng = random.Random(options['seed'])
+    call_command('migrate', verbosity=0)
+    service_ids, customer_ids = siapkan_data(options['orders'], rng)
+    connection.close()
+
+    hasil = {'tulis': [], 'baca': [], 'lock_errors': 0, 'other_errors': 0}
+    kunci = threading.Lock()
+    batas = time.monotonic() + options['duration']
+
+    def thread(nomor):
+        rng_thread = random.Random(options['seed'] * 1000 + nomor)
+        while time.monotonic() < batas:
+            tulis = rng_thread.random() < options['write_ratio']
+            operasi = rng_thread.choice(OPERASI_TULIS if tulis else OPERASI_BACA)
+            # Seperti siklus request: koneksi ditutup / dipakai ulang sesuai CONN_MAX_AGE
+            close_old_connections()
+            mulai = time.perf_counter()
+            try:
+                operasi(rng_thread, service_ids, customer_ids)
+            except OperationalError as exc:
+                with kunci:
+                    if 'locked' in str(exc) or 'busy' in str(exc):
+                        hasil['lock_errors'] += 1
+                    else:
+                        hasil['other_errors'] += 1
+                continue
+            finally:
+                close_old_connections()
+            durasi_ms = (time.perf_counter() - mulai) * 1000
+            with kunci:
+                hasil['tulis' if tulis else 'baca'].append(durasi_ms)
+        connection.close()
+
+    threads = [threading.Thread(target=thread, args=(i,)) for i in range(options['threads'])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    semua = hasil['tulis'] + hasil['baca']
+    return {
+        'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+        'operasi': len(semua),
+        'operasi_per_detik': round(len(semua) / options['duration'], 1),
+        'lock_errors': hasil['lock_errors'],
+        'other_errors': hasil['other_errors'],
+        'p50_ms': persentil(semua, 50),
+        'p95_ms': persentil(semua, 95),
+        'p95_tulis_ms': persentil(hasil['tulis'], 95),
+        'p95_baca_ms': persentil(hasil['baca'], 95),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark konkurensi DB: thread campur tulis order / ubah status & baca analytics / dashboard '
+        'ke file SQLite sementara, per profil (SOLECLEAN_DB_PROFILE). Lapor lock error & p95 latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', nargs='+', default=list(SQLITE_PROFILES), choices=SQLITE_PROFILES)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10, help='Detik per profil')
+        parser.add_argument('--write-ratio', type=float, default=0.5)
+        parser.add_argument('--orders', type=int, default=500, help='Jumlah order awal')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Simpan hasil ke file JSON')
+        parser.add_argument('--worker', action='store_true', help='(internal) jalankan 1 profil di proses ini')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(jalankan_worker(options)))
+            return
+
+        hasil = []
+        with tempfile.TemporaryDirectory() as folder:
+            for profile in options['profile']:
+                # Proses terpisah: settings DATABASES dibaca ulang dari environment
+                env = dict(os.environ, SOLECLEAN_DB_PROFILE=profile,
+                           SOLECLEAN_DB_PATH=os.path.join(folder, f'bench_{profile}.sqlite3'))
+                env.pop('DATABASE_URL', None)
+                env['DJANGO_SETTINGS_MODULE'] = settings.SETTINGS_MODULE  # juga kalau dipanggil lewat django-admin --settings
+                proses = subprocess.run(
+                    [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_db', '--worker',
+                     '--threads', str(options['threads']), '--duration', str(options['duration']),
+                     '--write-ratio', str(options['write_ratio']), '--orders', str(options['orders']),
+                     '--seed', str(options['seed'])],
+                    env=env, capture_output=True, text=True,
+                )
+                if proses.returncode:
+                    self.stderr.write(proses.stderr)
+                    pesan = (proses.stderr.strip().splitlines() or [f'exit code {proses.returncode}'])[-1]
+                    raise CommandError(f'worker {profile} gagal: {pesan}', returncode=proses.returncode)
+                baris = dict(json.loads(proses.stdout.strip().splitlines()[-1]), profile=profile)
+                hasil.append(baris)
+                self.stdout.write(
+                    f"{profile:<6} {baris['operasi_per_detik']:7.1f} op/s  lock error {baris['lock_errors']:4d}  "
+                    f"p50 {baris['p50_ms'] or 0:7.1f} ms  p95 {baris['p95_ms'] or 0:7.1f} ms  "
+                    f"(tulis {baris['p95_tulis_ms'] or 0:.1f} / baca {baris['p95_baca_ms'] or 0:.1f} ms)"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(hasil, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Hasil disimpan ke {options['output']}"))
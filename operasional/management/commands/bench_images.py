@@ -0,0 +1,133 @@
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from django.core.files import File
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageOps
+from operasional.models import compress_image
+
+
+def compress_image_lama(image):
+    """compress_image versi lama (decode penuh + BytesIO), cuma buat pembanding"""
+    im = Image.open(image)
+    if im.mode != 'RGB':
+        im = im.convert('RGB')
+    max_width = 1000
+    if im.width > max_width:
+        output_size = (max_width, int(im.height * (max_width/im.width)))
+        im.thumbnail(output_size)
+    output = BytesIO()
+    im.save(output, format='JPEG', quality=60)
+    output.seek(0)
+    return InMemoryUploadedFile(
+        output, 'ImageField', "%s.jpg" % image.name.split('.')[0], 'image/jpeg', sys.getsizeof(output), None
+    )
+
+
+def compress_image_lama_diputar(image):
+    """
+    compress_image_lama + orientasi EXIF (cara gampang: putar dulu, baru dikecilkan).
+    Hasilnya sama persis dengan versi baru (potret 1000px), jadi pembanding yang adil
+    buat foto miring: versi lama tanpa putar hasilnya lebih kecil karena orientasinya salah
+    """
+    im = ImageOps.exif_transpose(Image.open(image))
+    if im.mode != 'RGB':
+        im = im.convert('RGB')
+    max_width = 1000
+    if im.width > max_width:
+        im.thumbnail((max_width, int(im.height * (max_width/im.width))))
+    output = BytesIO()
+    im.save(output, format='JPEG', quality=60)
+    output.seek(0)
+    return InMemoryUploadedFile(
+        output, 'ImageField', "%s.jpg" % image.name.split('.')[0], 'image/jpeg', output.getbuffer().nbytes, None
+    )
+
+
+VARIANTS = {'lama': compress_image_lama, 'lama_putar': compress_image_lama_diputar, 'baru': compress_image}
+
+
+def rss_sekarang_kb():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def ukur(variant, path, repeat, conn):
+    """Jalan di proses anak (fork), supaya peak RSS tiap varian gak saling campur"""
+    awal_kb = rss_sekarang_kb()
+    durasi = []
+    for _ in range(repeat):
+        with open(path, 'rb') as f:
+            mulai = time.perf_counter()
+            hasil = VARIANTS[variant](File(f, name=os.path.basename(path)))
+            durasi.append(time.perf_counter() - mulai)
+    conn.send({
+        'detik_per_foto': min(durasi),
+        'peak_rss_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - awal_kb) / 1024,
+        'ukuran_hasil_kb': hasil.size / 1024,
+    })
+    conn.close()
+
+
+def buat_foto(megapixel, mode, folder, orientasi=6):
+    """Foto palsu ala kamera HP: JPEG noise 4:3, EXIF orientasi 6 = potret, 1 = landscape biasa"""
+    lebar = int((megapixel * 1_000_000 * 4 / 3) ** 0.5)
+    tinggi = lebar * 3 // 4
+    kanal = [Image.effect_noise((lebar, tinggi), 40 + 10 * i) for i in range(3)]
+    im = Image.merge('RGB', kanal).convert(mode)
+    exif = Image.Exif()
+    exif[0x0112] = orientasi
+    path = os.path.join(folder, f'foto_{megapixel}mp_{mode}_o{orientasi}.jpg')
+    im.save(path, format='JPEG', quality=92, exif=exif)
+    return path
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark compress_image lama vs lama + putar EXIF vs baru: waktu & peak RSS per foto '
+        '(foto sintetis landscape & potret)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--megapixel', type=int, nargs='+', default=[12, 48])
+        parser.add_argument('--mode', nargs='+', default=['RGB', 'CMYK'], help='Mode warna JPEG sumber')
+        parser.add_argument(
+            '--orientation', type=int, nargs='+', default=[1, 6],
+            help='Orientasi EXIF foto sumber: 1 = landscape (hasil semua varian sama ukuran), 6 = potret HP',
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--output', help='Simpan hasil ke file JSON')
+
+    def handle(self, *args, **options):
+        ctx = multiprocessing.get_context('fork')
+        hasil = []
+        with tempfile.TemporaryDirectory() as folder:
+            for orientasi, mode, megapixel in itertools.product(
+                options['orientation'], options['mode'], options['megapixel']
+            ):
+                path = buat_foto(megapixel, mode, folder, orientasi)
+                for variant in VARIANTS:
+                    terima, kirim = ctx.Pipe(duplex=False)
+                    proses = ctx.Process(target=ukur, args=(variant, path, options['repeat'], kirim))
+                    proses.start()
+                    kirim.close()  # anak crash -> recv() langsung EOFError, gak nunggu selamanya
+                    baris = dict(terima.recv(), megapixel=megapixel, mode=mode, orientasi=orientasi, variant=variant)
+                    proses.join()
+                    hasil.append(baris)
+                    self.stdout.write(
+                        f"{megapixel:>3} MP {mode:<4} o{orientasi}  {variant:<10} {baris['detik_per_foto'] * 1000:8.1f} ms/foto  "
+                        f"peak RSS +{baris['peak_rss_mb']:7.1f} MB  hasil {baris['ukuran_hasil_kb']:6.1f} KB"
+                    )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(hasil, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Hasil disimpan ke {options['output']}"))
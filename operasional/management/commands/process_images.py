@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from operasional.models import ImageJob
+
+class Command(BaseCommand):
+    help = 'Worker antrian kompres foto sepatu (tabel ImageJob). Jalan terus sampai di-stop, atau pakai --once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Kerjakan semua job yang siap, lalu berhenti')
+        parser.add_argument('--batch', type=int, default=10, help='Jumlah job yang diambil sekali jalan')
+        parser.add_argument('--sleep', type=float, default=5.0, help='Jeda (detik) kalau antrian kosong')
+        parser.add_argument('--retry-failed', action='store_true', help='Masukkan lagi job FAILED ke antrian')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            jumlah = ImageJob.requeue_failed()
+            self.stdout.write(f'🔁 {jumlah} job gagal dimasukkan lagi ke antrian')
+
+        sukses = gagal = 0
+        try:
+            while True:
+                jobs = ImageJob.claim(limit=options['batch'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                for job in jobs:
+                    if job.process():
+                        sukses += 1
+                    else:
+                        gagal += 1
+                        self.stderr.write(f'⚠️ {job}: {job.last_error}')
+        except KeyboardInterrupt:
+            # Job yang lagi jalan akan diambil ulang setelah ImageJob.LOCK_TIMEOUT
+            self.stdout.write('Worker dihentikan')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Foto diproses: {sukses} sukses, {gagal} gagal'))
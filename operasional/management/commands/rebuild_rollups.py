@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from operasional.caching import bump_data_version
+from operasional.models import DailyRevenue, ItemStatusEvent
+
+class Command(BaseCommand):
+    help = 'Backfill / hitung ulang rollup DailyRevenue (dari order) & metrik pengerjaan (dari ItemStatusEvent)'
+
+    def handle(self, *args, **kwargs):
+        jumlah = DailyRevenue.rebuild()
+        jumlah_status, jumlah_turnaround = ItemStatusEvent.rebuild_metrics()
+        bump_data_version()  # cache analytics lama jadi basi
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ DailyRevenue dibangun ulang: {jumlah} baris (hari x metode bayar)')
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Metrik pengerjaan dibangun ulang: {jumlah_status} baris status, {jumlah_turnaround} baris turnaround'
+        ))
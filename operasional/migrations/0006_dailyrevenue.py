@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:34
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+
+def backfill_daily_revenue(apps, schema_editor):
+    Order = apps.get_model('operasional', 'Order')
+    DailyRevenue = apps.get_model('operasional', 'DailyRevenue')
+    rows = {}
+    completed = Order.objects.filter(status='COMPLETED', tanggal_selesai__isnull=False).annotate(
+        omzet=Sum('items__service__harga'), jumlah_item=Count('items'),
+    ).values_list('tanggal_selesai', 'metode_pembayaran', 'omzet', 'jumlah_item')
+    for tanggal_selesai, metode, omzet, jumlah_item in completed.iterator():
+        key = (timezone.localdate(tanggal_selesai), metode)
+        row = rows.setdefault(key, DailyRevenue(tanggal=key[0], metode_pembayaran=metode))
+        row.omzet += omzet or 0
+        row.jumlah_order += 1
+        row.jumlah_item += jumlah_item
+    DailyRevenue.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0005_pengeluaran_sub_kategori'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('metode_pembayaran', models.CharField(choices=[('CASH', 'Cash / Tunai'), ('TRANSFER', 'Transfer Bank / QRIS'), ('UNPAID', 'Belum Bayar (Hutang)')], max_length=20)),
+                ('omzet', models.DecimalField(decimal_places=0, default=0, max_digits=14)),
+                ('jumlah_order', models.PositiveIntegerField(default=0)),
+                ('jumlah_item', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['tanggal', 'metode_pembayaran'],
+                'constraints': [models.UniqueConstraint(fields=('tanggal', 'metode_pembayaran'), name='unique_daily_revenue')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_revenue, migrations.RunPython.noop),
+    ]
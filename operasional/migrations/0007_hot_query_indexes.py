@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0006_dailyrevenue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'tanggal_selesai'], name='order_status_selesai_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['tanggal_masuk'], name='order_tanggal_masuk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['status', 'order'], name='orderitem_status_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pengeluaran',
+            index=models.Index(fields=['tanggal', 'kategori'], name='pengeluaran_tanggal_kat_idx'),
+        ),
+    ]
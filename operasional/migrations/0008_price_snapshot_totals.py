@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    Service = apps.get_model('operasional', 'Service')
+    Order = apps.get_model('operasional', 'Order')
+    OrderItem = apps.get_model('operasional', 'OrderItem')
+
+    # 1. Snapshot harga item = harga service saat ini
+    OrderItem.objects.filter(harga_saat_order__isnull=True).update(
+        harga_saat_order=Subquery(Service.objects.filter(pk=OuterRef('service_id')).values('harga')[:1])
+    )
+
+    # 2. Total per order dari snapshot item
+    per_order = OrderItem.objects.filter(order=OuterRef('pk')).values('order')
+    Order.objects.update(
+        total_harga=Coalesce(Subquery(per_order.annotate(s=Sum('harga_saat_order')).values('s')), 0),
+        jumlah_item=Coalesce(Subquery(per_order.annotate(c=Count('id')).values('c')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='jumlah_item',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_harga',
+            field=models.DecimalField(decimal_places=0, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='harga_saat_order',
+            field=models.DecimalField(blank=True, decimal_places=0, max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0008_price_snapshot_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='foto_status',
+            field=models.CharField(choices=[('PENDING', 'Foto Sedang Diproses'), ('READY', 'Foto Siap'), ('FAILED', 'Gagal Proses Foto')], default='READY', editable=False, max_length=10),
+        ),
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('foto_sebelum', 'Foto Sebelum'), ('foto_sesudah', 'Foto Sesudah')], max_length=20)),
+                ('nama_file', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Menunggu'), ('RUNNING', 'Diproses'), ('DONE', 'Selesai'), ('FAILED', 'Gagal')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_jobs', to='operasional.orderitem')),
+            ],
+            options={
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='imagejob_status_avail_idx')],
+            },
+        ),
+    ]
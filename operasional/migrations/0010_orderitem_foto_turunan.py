@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0009_image_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='foto_turunan',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
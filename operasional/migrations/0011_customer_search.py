@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+def backfill_kolom_cari(apps, schema_editor):
+    Customer = apps.get_model('operasional', 'Customer')
+
+    # Sama dengan models.normalisasi_wa / Customer.save (migrasi gak boleh pakai model asli)
+    def normalisasi_wa(nomor):
+        digit = ''.join(c for c in str(nomor or '') if c.isdigit())
+        return '62' + digit[1:] if digit.startswith('0') else digit
+
+    batch = []
+    for customer in Customer.objects.only('id', 'nama', 'whatsapp').iterator(chunk_size=2000):
+        customer.whatsapp_normal = normalisasi_wa(customer.whatsapp)
+        customer.nama_cari = (customer.nama or '').casefold()
+        batch.append(customer)
+        if len(batch) == 2000:
+            Customer.objects.bulk_update(batch, ['whatsapp_normal', 'nama_cari'])
+            batch = []
+    Customer.objects.bulk_update(batch, ['whatsapp_normal', 'nama_cari'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0010_orderitem_foto_turunan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='nama_cari',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='whatsapp_normal',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['whatsapp_normal', 'id'], name='customer_wa_normal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['nama_cari', 'id'], name='customer_nama_cari_idx'),
+        ),
+        migrations.RunPython(backfill_kolom_cari, migrations.RunPython.noop),
+    ]
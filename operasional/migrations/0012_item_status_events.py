@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_status_sejak(apps, schema_editor):
+    """Item lama: anggap status sekarang mulai dari tanggal selesai item, atau tanggal order masuk"""
+    OrderItem = apps.get_model('operasional', 'OrderItem')
+    Order = apps.get_model('operasional', 'Order')
+    tanggal_masuk = Order.objects.filter(pk=OuterRef('order_id')).values('tanggal_masuk')[:1]
+    OrderItem.objects.update(status_sejak=Coalesce('tanggal_selesai_item', Subquery(tanggal_masuk)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0011_customer_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='status_sejak',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ItemStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_lama', models.CharField(choices=[('PENDING', 'Baru Masuk'), ('PROCESS', 'Sedang Dikerjakan'), ('READY', 'Selesai / Siap Ambil'), ('COMPLETED', 'Sudah Diambil')], max_length=20)),
+                ('status_baru', models.CharField(choices=[('PENDING', 'Baru Masuk'), ('PROCESS', 'Sedang Dikerjakan'), ('READY', 'Selesai / Siap Ambil'), ('COMPLETED', 'Sudah Diambil')], max_length=20)),
+                ('waktu', models.DateTimeField(default=django.utils.timezone.now)),
+                ('durasi_detik', models.PositiveIntegerField(default=0)),
+                ('turnaround_detik', models.PositiveIntegerField(blank=True, null=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='operasional.orderitem')),
+                ('oleh', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'waktu'], name='statusevent_item_waktu_idx'), models.Index(fields=['waktu'], name='statusevent_waktu_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemStatusHarian',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('status_lama', models.CharField(choices=[('PENDING', 'Baru Masuk'), ('PROCESS', 'Sedang Dikerjakan'), ('READY', 'Selesai / Siap Ambil'), ('COMPLETED', 'Sudah Diambil')], max_length=20)),
+                ('status_baru', models.CharField(choices=[('PENDING', 'Baru Masuk'), ('PROCESS', 'Sedang Dikerjakan'), ('READY', 'Selesai / Siap Ambil'), ('COMPLETED', 'Sudah Diambil')], max_length=20)),
+                ('teknisi', models.CharField(blank=True, max_length=150)),
+                ('jumlah', models.PositiveIntegerField(default=0)),
+                ('total_durasi_detik', models.PositiveBigIntegerField(default=0)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='operasional.service')),
+            ],
+            options={
+                'ordering': ['tanggal'],
+                'constraints': [models.UniqueConstraint(fields=('tanggal', 'service', 'status_lama', 'status_baru', 'teknisi'), name='unique_item_status_harian')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TurnaroundHarian',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('jumlah', models.PositiveIntegerField(default=0)),
+                ('total_detik', models.PositiveBigIntegerField(default=0)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='operasional.service')),
+            ],
+            options={
+                'ordering': ['tanggal', 'bucket'],
+                'constraints': [models.UniqueConstraint(fields=('tanggal', 'service', 'bucket'), name='unique_turnaround_harian')],
+            },
+        ),
+        migrations.RunPython(backfill_status_sejak, migrations.RunPython.noop),
+    ]
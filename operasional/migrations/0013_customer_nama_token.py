@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_token_nama(apps, schema_editor):
+    Customer = apps.get_model('operasional', 'Customer')
+    CustomerNamaToken = apps.get_model('operasional', 'CustomerNamaToken')
+
+    # Sama dengan models.token_nama (migrasi gak boleh pakai model asli)
+    def token_nama(nama):
+        kata = (nama or '').casefold().split()
+        return [' '.join(kata[i:]) for i in range(len(kata))]
+
+    batch = []
+    for customer in Customer.objects.only('id', 'nama').iterator(chunk_size=2000):
+        batch += [CustomerNamaToken(customer_id=customer.id, token=token) for token in token_nama(customer.nama)]
+        if len(batch) >= 2000:
+            CustomerNamaToken.objects.bulk_create(batch)
+            batch = []
+    CustomerNamaToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0012_item_status_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerNamaToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nama_token', to='operasional.customer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'customer'], name='customer_token_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_token_nama, migrations.RunPython.noop),
+    ]
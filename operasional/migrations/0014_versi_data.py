@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:57
+
+import time
+
+from django.db import migrations, models
+
+
+def buat_versi_data(apps, schema_editor):
+    # Baris versi data global langsung ada, request pertama gak perlu INSERT
+    VersiData = apps.get_model('operasional', 'VersiData')
+    VersiData.objects.get_or_create(kunci='data', defaults={'versi': time.time_ns()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0013_customer_nama_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersiData',
+            fields=[
+                ('kunci', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('versi', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(buat_versi_data, migrations.RunPython.noop),
+    ]
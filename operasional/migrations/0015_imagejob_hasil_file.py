@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operasional', '0014_versi_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='hasil_file',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -1,22 +1,119 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest, TruncDate
+from django.db.models import Case, Count, ExpressionWrapper, F, Func, IntegerField, Min, OuterRef, Q, Subquery, Sum, Value, When
 from django.utils import timezone
-from PIL import Image   # <-- Library Pengolah Gambar
-from io import BytesIO  # <-- Buat nyimpen file sementara
+from django.utils.functional import cached_property
+from .caching import bump_data_version, bump_order_version
+from . import events, profiling
+from django.conf import settings
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError   # <-- Library Pengolah Gambar
+from tempfile import SpooledTemporaryFile  # <-- Hasil kompres: di RAM, pindah ke disk kalau besar
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
-import sys
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import bisect
+import copy
+import math
+import os
 
 # ==========================================
 # 1. TABEL PELANGGAN (CRM)
 # ==========================================
+def normalisasi_wa(nomor):
+    """Nomor WA jadi digit saja format 62xxx: '0812-3456' / '+62 812 3456' -> '628123456'"""
+    digit = ''.join(c for c in str(nomor or '') if c.isdigit())
+    if digit.startswith('0'):
+        digit = '62' + digit[1:]
+    return digit
+
+
+def token_nama(nama):
+    """Potongan nama mulai dari tiap kata (casefold): 'Budi Santoso' -> ['budi santoso', 'santoso']"""
+    kata = (nama or '').casefold().split()
+    return [' '.join(kata[i:]) for i in range(len(kata))]
+
+
+def _rentang_prefix(kolom, nilai):
+    """Filter prefix sebagai rentang (>= nilai, < nilai + karakter terbesar): index range scan, bukan LIKE"""
+    return {f'{kolom}__gte': nilai, f'{kolom}__lt': nilai + '\U0010ffff'}
+
+
+class CustomerQuerySet(models.QuerySet):
+    def cari(self, q):
+        """
+        Typeahead pelanggan: input angka = prefix nomor WA, selain itu = prefix salah satu kata nama
+        ('santo' ketemu 'Budi Santoso'), lewat tabel CustomerNamaToken. Dua-duanya di kolom
+        ter-normalisasi, jadi tetap index range scan (gak pakai LIKE / fungsi di kolom).
+        """
+        q = (q or '').strip()
+        if not q:
+            return self.none()
+        if q.lstrip('+').replace(' ', '').replace('-', '').isdigit():
+            return self.filter(**_rentang_prefix('whatsapp_normal', normalisasi_wa(q))).order_by('whatsapp_normal', 'id')
+        nilai = ' '.join(q.casefold().split())
+        cocok = CustomerNamaToken.objects.filter(**_rentang_prefix('token', nilai)).values('customer_id')
+        return self.filter(pk__in=cocok).order_by('nama_cari', 'id')
+
+
 class Customer(models.Model):
     nama = models.CharField(max_length=100)
     whatsapp = models.CharField(max_length=15, unique=True)
     alamat = models.TextField(blank=True, null=True)
     join_date = models.DateTimeField(auto_now_add=True)
 
+    # Kolom bantu pencarian (diisi otomatis di save)
+    whatsapp_normal = models.CharField(max_length=20, blank=True, editable=False)
+    nama_cari = models.CharField(max_length=100, blank=True, editable=False)
+
+    objects = CustomerQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Typeahead input order: prefix nomor WA / prefix nama (case-insensitive)
+            models.Index(fields=['whatsapp_normal', 'id'], name='customer_wa_normal_idx'),
+            models.Index(fields=['nama_cari', 'id'], name='customer_nama_cari_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nama} ({self.whatsapp})"
 
+    def save(self, *args, **kwargs):
+        self.whatsapp_normal = normalisasi_wa(self.whatsapp)
+        self.nama_cari = (self.nama or '').casefold()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'whatsapp_normal', 'nama_cari'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or 'nama' in update_fields:
+                self.simpan_token_nama()
+
+    def simpan_token_nama(self):
+        """Tulis ulang token pencarian nama (lihat CustomerNamaToken)"""
+        self.nama_token.all().delete()
+        CustomerNamaToken.objects.bulk_create(
+            CustomerNamaToken(customer=self, token=token) for token in token_nama(self.nama)
+        )
+
+
+class CustomerNamaToken(models.Model):
+    """
+    Index typeahead nama: 1 baris per kata nama, isinya nama mulai dari kata itu
+    ('budi santoso wijaya', 'santoso wijaya', 'wijaya'). Prefix token = prefix nama depan,
+    tengah atau belakang, dan input beberapa kata ('santoso wi') tetap cocok.
+    """
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='nama_token')
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'customer'], name='customer_token_idx'),
+        ]
+
+    def __str__(self):
+        return self.token
+
 # ==========================================
 # 2. TABEL SERVICE
 # ==========================================
@@ -31,6 +128,126 @@ class Service(models.Model):
 # ==========================================
 # 3. TABEL ORDER (Update: Payment & Logic)
 # ==========================================
+# Priority status item: angka kecil = paling butuh perhatian
+STATUS_PRIORITY = {
+    'PENDING': 1,
+    'PROCESS': 2,
+    'READY': 3,
+    'COMPLETED': 4,
+}
+
+# Status item yang masih muncul di antrian dashboard
+ACTIVE_STATUSES = ['PENDING', 'PROCESS', 'READY']
+
+# Lane dashboard: key = nilai ?lane=..., value = filter di atas with_queue_state()
+QUEUE_LANES = {
+    'PENDING': Q(queue_status='PENDING'),
+    'PROCESS': Q(queue_status='PROCESS'),
+    'READY': Q(queue_status='READY'),
+    'OVERDUE': Q(queue_overdue=True),
+}
+
+
+class SisaHari(Func):
+    """Selisih hari (dibulatkan ke bawah) antara deadline dan `now`, sama seperti timedelta.days"""
+    output_field = IntegerField()
+
+    def __init__(self, deadline, now, **extra):
+        super().__init__(deadline, Value(now), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='CAST(FLOOR(julianday(%(expressions)s)) AS INTEGER)',
+            arg_joiner=') - julianday(',
+            **extra_context
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='FLOOR(EXTRACT(EPOCH FROM (%(expressions)s)) / 86400)::integer',
+            arg_joiner=' - ',
+            **extra_context
+        )
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_queue_state(self, now=None):
+        """
+        Anotasi state antrian dalam 1 query (buat dashboard):
+        - queue_status_rank / queue_status: status item dengan priority tertinggi
+        - queue_deadline: tanggal_masuk + durasi service item pertama
+        - queue_overdue: sudah lewat deadline & belum READY/COMPLETED
+        - queue_sisa_hari: sisa hari ke deadline (sama dengan deadline_info)
+        """
+        now = now or timezone.now()
+        rank_cases = [When(items__status=s, then=Value(rank)) for s, rank in STATUS_PRIORITY.items()]
+        durasi_item_pertama = Subquery(
+            OrderItem.objects.filter(order=OuterRef('pk')).order_by('pk').values('service__durasi_hari')[:1]
+        )
+        durasi = ExpressionWrapper(
+            durasi_item_pertama * Value(timezone.timedelta(days=1)),
+            output_field=models.DurationField()
+        )
+        return self.annotate(
+            queue_status_rank=Min(Case(*rank_cases, output_field=IntegerField())),
+            queue_deadline=ExpressionWrapper(F('tanggal_masuk') + durasi, output_field=models.DateTimeField()),
+        ).annotate(
+            queue_status=Case(
+                *[When(queue_status_rank=rank, then=Value(s)) for s, rank in STATUS_PRIORITY.items()],
+                default=Value('PENDING'),
+            ),
+            queue_overdue=Case(
+                When(Q(queue_deadline__lt=now) & ~Q(status__in=['READY', 'COMPLETED']), then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+            queue_sisa_hari=SisaHari(F('queue_deadline'), now),
+        )
+
+    def with_items(self):
+        """Customer + items + service item sekalian, biar template gak N+1"""
+        return self.select_related('customer').prefetch_related('items__service')
+
+    def active_queue(self, now=None):
+        """Order yang masih punya item PENDING / PROCESS / READY, urut terbaru"""
+        # Saring dulu lewat index OrderItem(status, order) biar gak scan semua order
+        active_order_ids = OrderItem.objects.filter(status__in=ACTIVE_STATUSES).values('order_id')
+        return (
+            self.filter(pk__in=active_order_ids)
+            .with_queue_state(now=now)
+            .filter(queue_status_rank__lte=STATUS_PRIORITY['READY'])
+            .select_related('customer')
+            .order_by('-tanggal_masuk', '-id')
+        )
+
+    def lane(self, lane):
+        """Filter antrian per lane. Lane gak dikenal = semua antrian"""
+        lane_filter = QUEUE_LANES.get(lane)
+        return self.filter(lane_filter) if lane_filter is not None else self
+
+    def after_cursor(self, tanggal_masuk, order_id):
+        """Keyset pagination di (tanggal_masuk, id) DESC, tanpa OFFSET"""
+        return self.filter(
+            Q(tanggal_masuk__lt=tanggal_masuk) | Q(tanggal_masuk=tanggal_masuk, id__lt=order_id)
+        )
+
+    def ubah_status_item(self, status, now=None, oleh=None):
+        """Bulk: semua item aktif (belum diambil) order-order ini -> status baru. Return jumlah item berubah"""
+        return OrderItem.objects.filter(
+            order__in=self.values('pk'), status__in=ACTIVE_STATUSES
+        ).ubah_status(status, now=now, oleh=oleh)
+
+    def lane_counts(self):
+        """Jumlah order per lane + total, dalam 1 aggregate query"""
+        counts = self.aggregate(
+            ALL=Count('id'),
+            **{lane: Count('id', filter=lane_filter) for lane, lane_filter in QUEUE_LANES.items()}
+        )
+        return {lane: total or 0 for lane, total in counts.items()}
+
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Baru Masuk'),
@@ -54,32 +271,138 @@ class Order(models.Model):
     tanggal_selesai = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
 
+    # Total tersimpan (denormalisasi), di-update lewat refresh_totals() tiap item berubah
+    total_harga = models.DecimalField(max_digits=12, decimal_places=0, default=0, editable=False)
+    jumlah_item = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Analytics: order COMPLETED per rentang tanggal selesai
+            models.Index(fields=['status', 'tanggal_selesai'], name='order_status_selesai_idx'),
+            # Dashboard: urut & keyset pagination by tanggal masuk
+            models.Index(fields=['tanggal_masuk'], name='order_tanggal_masuk_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} - {self.customer.nama}"
 
+    # ROLLUP OMZET HARIAN (lihat DailyRevenue)
+    # Order cuma dihitung ke omzet kalau COMPLETED. Key = (hari selesai, metode bayar).
+    @property
+    def rollup_key(self):
+        if self.status == 'COMPLETED' and self.tanggal_selesai:
+            return (timezone.localdate(self.tanggal_selesai), self.metode_pembayaran)
+        return None
+
+    def _data_tersimpan(self):
+        """
+        Kolom rollup & total versi database (dikunci sampai transaksi selesai).
+        Selalu baca DB, karena instance bisa basi (di-load sebelum order lunas / item berubah).
+        """
+        if not self.pk or self._state.adding:
+            return None
+        return Order.objects.select_for_update().filter(pk=self.pk).values(
+            'status', 'metode_pembayaran', 'tanggal_selesai', 'total_harga', 'jumlah_item'
+        ).first()
+
+    def save(self, *args, **kwargs):
+        # total_harga & jumlah_item cuma boleh diubah refresh_totals(), biar instance
+        # lama (di-load sebelum item ditambah) gak menimpa total yang sudah benar
+        if not self._state.adding and self.pk and 'update_fields' not in kwargs:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('total_harga', 'jumlah_item')
+            ]
+
+        # Lunas / dibuka lagi / ganti metode bayar -> geser angka di DailyRevenue (1 transaksi)
+        with transaction.atomic():
+            lama = self._data_tersimpan()
+            if lama:
+                self.total_harga, self.jumlah_item = lama['total_harga'], lama['jumlah_item']
+            key_lama = Order(**lama).rollup_key if lama else None
+            super().save(*args, **kwargs)
+            key_baru = self.rollup_key
+            if key_lama != key_baru:
+                DailyRevenue.pindahkan_order(self, key_lama, key_baru)
+
+    def cabut_dari_rollup(self):
+        """
+        Order mau dihapus -> kontribusinya di DailyRevenue dikurangi. Dipanggil signal pre_delete
+        (di dalam transaksi delete), jadi jalan juga buat queryset.delete(), aksi hapus admin
+        & order yang ikut kehapus bareng customer.
+        """
+        lama = self._data_tersimpan()
+        tersimpan = Order(**lama) if lama else None
+        if tersimpan and tersimpan.rollup_key:
+            DailyRevenue.pindahkan_order(tersimpan, tersimpan.rollup_key, None)
+
+    def refresh_totals(self):
+        """Hitung ulang total_harga & jumlah_item dari harga snapshot item"""
+        with transaction.atomic():
+            lama = self._data_tersimpan()
+            if not lama:
+                return
+            totals = self.items.aggregate(total=Sum('harga_saat_order'), jumlah=Count('id'))
+            total_harga = totals['total'] or 0
+            jumlah_item = totals['jumlah'] or 0
+            if (total_harga, jumlah_item) != (lama['total_harga'], lama['jumlah_item']):
+                # Order yang sudah lunas: selisihnya ikut digeser di rollup omzet
+                key = Order(**lama).rollup_key
+                if key:
+                    DailyRevenue._tambah(
+                        key, total_harga - lama['total_harga'], 0, jumlah_item - lama['jumlah_item']
+                    )
+                Order.objects.filter(pk=self.pk).update(total_harga=total_harga, jumlah_item=jumlah_item)
+        self.total_harga = total_harga
+        self.jumlah_item = jumlah_item
+
+    # RINGKASAN ITEMS (1x jalan, di-cache di instance)
+    # Pakai hasil prefetch_related('items') kalau ada, jadi property di bawah gak nembak
+    # query lagi. Kalau belum di-prefetch: cukup 1 query. Service cuma dibaca buat deadline
+    # (prefetch_related('items__service') biar is_overdue / deadline_info juga tanpa query).
+    @cached_property
+    def _item_state(self):
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'items' in prefetched:
+            items = list(prefetched['items'])
+        else:
+            items = list(self.items.select_related('service'))
+
+        if not items:
+            return {'highest_status': 'PENDING', 'first_item': None}
+
+        highest_status = items[0].status
+        first_item = items[0]
+        for item in items[1:]:
+            if STATUS_PRIORITY.get(item.status, 999) < STATUS_PRIORITY.get(highest_status, 999):
+                highest_status = item.status
+            if item.pk < first_item.pk:
+                first_item = item
+
+        return {'highest_status': highest_status, 'first_item': first_item}
+
+    @cached_property
+    def _deadline(self):
+        """Tanggal masuk + durasi service item pertama, None kalau belum ada item"""
+        first_item = self._item_state['first_item']
+        if first_item is None:
+            return None
+        return self.tanggal_masuk + timezone.timedelta(days=first_item.service.durasi_hari)
+
     # STATUS TERTINGGI DARI ITEMS (Priority-based)
+    # Kalau order diambil lewat Order.objects.with_queue_state(), nilai anotasi
+    # yang dipakai. Selain itu dihitung dari _item_state / _deadline.
     @property
     def highest_item_status(self):
         """
         Return status dengan priority tertinggi dari semua items.
         Priority: PENDING > PROCESS > READY > COMPLETED
         """
-        if not self.items.exists():
-            return 'PENDING'
-        
-        status_priority = {
-            'PENDING': 1,
-            'PROCESS': 2,
-            'READY': 3,
-            'COMPLETED': 4,
-        }
-        
-        # Ambil semua status items
-        items_statuses = self.items.values_list('status', flat=True)
-        
-        # Return status dengan priority terendah (tertinggi prioritas = tertua)
-        highest_status = min(items_statuses, key=lambda s: status_priority.get(s, 999))
-        return highest_status
+        if hasattr(self, 'queue_status'):
+            return self.queue_status
+        return self._item_state['highest_status']
 
     @property
     def item_status_display(self):
@@ -95,18 +418,19 @@ class Order(models.Model):
     # LOGIKA DEADLINE / LAMPU MERAH
     @property
     def is_overdue(self):
-        if self.items.exists():
-            durasi = self.items.first().service.durasi_hari
-            target = self.tanggal_masuk + timezone.timedelta(days=durasi)
-            if timezone.now() > target and self.status not in ['READY', 'COMPLETED']:
-                return True
+        if hasattr(self, 'queue_overdue'):
+            return self.queue_overdue
+        target = self._deadline
+        if target and timezone.now() > target and self.status not in ['READY', 'COMPLETED']:
+            return True
         return False
 
     @property
     def deadline_info(self):
-        if self.items.exists():
-            durasi = self.items.first().service.durasi_hari
-            target = self.tanggal_masuk + timezone.timedelta(days=durasi)
+        if hasattr(self, 'queue_sisa_hari'):
+            return self.queue_sisa_hari if self.queue_sisa_hari is not None else 0
+        target = self._deadline
+        if target:
             sisa_waktu = target - timezone.now()
             return sisa_waktu.days
         return 0
@@ -114,24 +438,172 @@ class Order(models.Model):
 # ==========================================
 # FUNGSI KOMPRESOR GAMBAR
 # ==========================================
-def compress_image(image):
+def compress_image(image, max_width=None, quality=None):
+    """
+    Kecilkan foto jadi JPEG lebar maks IMAGE_MAX_WIDTH, tanpa decode resolusi penuh.
+    - JPEG di-decode langsung di skala 1/2, 1/4, 1/8 (Image.draft), jadi foto HP 50 MP
+      gak pernah jadi bitmap ratusan MB di RAM
+    - Orientasi EXIF diterapkan (foto HP gak miring)
+    - Foto di atas IMAGE_MAX_PIXELS ditolak (Image.DecompressionBombError)
+    """
+    max_width = max_width or settings.IMAGE_MAX_WIDTH
+    quality = quality or settings.IMAGE_JPEG_QUALITY
+
     im = Image.open(image)
+    if im.width * im.height > settings.IMAGE_MAX_PIXELS:
+        raise Image.DecompressionBombError(
+            f'Foto {im.width}x{im.height} melebihi batas {settings.IMAGE_MAX_PIXELS} piksel'
+        )
+
+    # Lebar tampilan setelah diputar EXIF (orientasi 5-8 = tukar lebar/tinggi)
+    miring = im.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8)
+    lebar_tampil = im.height if miring else im.width
+    if lebar_tampil > max_width:
+        skala = max_width / lebar_tampil
+        im.draft('RGB', (math.ceil(im.width * skala), math.ceil(im.height * skala)))
+        # Kecilkan dulu baru diputar, biar yang di-copy saat transpose cuma gambar kecil
+        im.thumbnail((im.width, max_width) if miring else (max_width, im.height))
+
+    im = ImageOps.exif_transpose(im)
     if im.mode != 'RGB':
         im = im.convert('RGB')
-    max_width = 1000
-    if im.width > max_width:
-        output_size = (max_width, int(im.height * (max_width/im.width)))
-        im.thumbnail(output_size)
-    output = BytesIO()
-    im.save(output, format='JPEG', quality=60)
+
+    output = SpooledTemporaryFile(max_size=settings.IMAGE_SPOOL_MAX_SIZE)
+    im.save(output, format='JPEG', quality=quality)
+    size = output.tell()
     output.seek(0)
-    new_image = InMemoryUploadedFile(
-        output, 'ImageField', "%s.jpg" % image.name.split('.')[0], 'image/jpeg', sys.getsizeof(output), None
-    )
-    return new_image
+    nama = os.path.splitext(os.path.basename(image.name))[0]
+    return InMemoryUploadedFile(output, 'ImageField', f'{nama}.jpg', 'image/jpeg', size, None)
+
+def buat_turunan(foto, widths=None):
+    """
+    Buat versi kecil (WebP + JPEG) dari foto yang sudah dikompres, per lebar IMAGE_DERIVATIVE_WIDTHS.
+    File disimpan di folder `turunan/` sebelah foto aslinya. Return data buat OrderItem.foto_turunan:
+    {'sumber': nama foto, 'varian': [{'lebar': 64, 'webp': nama, 'jpeg': nama}, ...]}
+    """
+    widths = sorted(widths or settings.IMAGE_DERIVATIVE_WIDTHS, reverse=True)
+    folder, nama = os.path.split(foto.name)
+    dasar = os.path.splitext(nama)[0]
+
+    with foto.storage.open(foto.name, 'rb') as sumber:
+        im = Image.open(sumber)
+        im.draft('RGB', (widths[0], im.height * widths[0] // im.width))
+        im = ImageOps.exif_transpose(im)
+        if im.mode != 'RGB':
+            im = im.convert('RGB')
+        lebar_asli = im.width
+
+    varian = []
+    tersimpan = []
+    try:
+        # Dari yang terbesar ke terkecil, tiap ukuran di-thumbnail dari ukuran sebelumnya
+        for lebar in widths:
+            im.thumbnail((lebar, im.height))
+            if varian and varian[-1]['lebar'] == im.width:
+                continue  # foto asli lebih kecil dari lebar ini
+            entry = {'lebar': im.width}
+            for format_, ext in (('WEBP', 'webp'), ('JPEG', 'jpg')):
+                if format_ == 'JPEG' and im.width == lebar_asli:
+                    entry['jpeg'] = foto.name  # ukuran penuh = file utama, gak perlu disimpan dua kali
+                    continue
+                output = BytesIO()
+                im.save(output, format=format_, quality=settings.IMAGE_JPEG_QUALITY)
+                nama_varian = foto.storage.save(
+                    f'{folder}/turunan/{dasar}_{im.width}.{ext}', ContentFile(output.getvalue())
+                )
+                tersimpan.append(nama_varian)
+                entry[ext if ext == 'webp' else 'jpeg'] = nama_varian
+            varian.append(entry)
+    except Exception:
+        # Gagal di tengah jalan: varian yang sudah ditulis dibuang, job dicoba ulang dari awal
+        for nama_varian in tersimpan:
+            foto.storage.delete(nama_varian)
+        raise
+    return {'sumber': foto.name, 'varian': varian[::-1]}
+
+
+def hapus_turunan(storage, turunan):
+    """Hapus file turunan lama (file utama gak ikut dihapus)"""
+    for entry in (turunan or {}).get('varian', []):
+        for nama in (entry.get('webp'), entry.get('jpeg')):
+            if nama and nama != turunan['sumber']:
+                storage.delete(nama)
+
+
+def hapus_turunan_item(foto_turunan):
+    """
+    Item sudah dihapus: turunan semua fotonya dibuang. Foto yang masih dipakai item lain
+    (mis. data sintetis yang berbagi foto) turunannya dibiarkan
+    """
+    storage = OrderItem._meta.get_field('foto_sebelum').storage
+    for data in (foto_turunan or {}).values():
+        if data and not OrderItem.objects.filter(
+            Q(foto_sebelum=data['sumber']) | Q(foto_sesudah=data['sumber'])
+        ).exists():
+            hapus_turunan(storage, data)
+
+# Status item yang dianggap selesai dikerjakan -> tanggal_selesai_item diisi
+SELESAI_STATUSES = ['READY', 'COMPLETED']
+
+# Kolom item yang dibutuhkan ItemStatusEvent.catat() (hasil .values())
+TRANSISI_FIELDS = ('pk', 'service_id', 'status', 'status_sejak', 'order__tanggal_masuk')
+
+
+class OrderItemQuerySet(models.QuerySet):
+    def ubah_status(self, status, now=None, oleh=None):
+        """
+        Ganti status semua item di queryset ini: 1 UPDATE (+ tanggal_selesai_item), row dikunci dulu.
+        Item yang statusnya sudah sama dilewati (tanggal selesainya gak ke-reset).
+        Tiap perpindahan dicatat di ItemStatusEvent (+ rollup metrik), `oleh` = user yang mengubah.
+        QuerySet.update() gak kirim signal, jadi cache & event live di-update manual di sini.
+        Return jumlah item yang berubah.
+        """
+        if status not in dict(OrderItem.STATUS_CHOICES):
+            raise ValueError(f'Status item tidak dikenal: {status}')
+        now = now or timezone.now()
+
+        with transaction.atomic():
+            target = list(
+                self.exclude(status=status).select_for_update(of=('self',))
+                .values(*TRANSISI_FIELDS, 'order_id')
+            )
+            if not target:
+                return 0
+            self.model.objects.filter(pk__in=[t['pk'] for t in target]).update(
+                status=status,
+                status_sejak=now,
+                tanggal_selesai_item=now if status in SELESAI_STATUSES else None,
+            )
+            ItemStatusEvent.catat(target, status, now, oleh=oleh)
+
+        def kabari():
+            bump_data_version()
+            bump_order_version(*{t['order_id'] for t in target})
+            for t in target:
+                events.publish('item', t['order_id'], item_id=t['pk'], status=status)
+
+        transaction.on_commit(kabari)
+        return len(target)
+
+    def ubah_status_banyak(self, perubahan, now=None, oleh=None):
+        """
+        {item_id: status_baru} -> 1 UPDATE per status tujuan, semua dalam 1 transaksi.
+        Cuma item di queryset ini yang boleh diubah (mis. order.items). Return jumlah item berubah.
+        """
+        per_status = {}
+        for item_id, status in perubahan.items():
+            per_status.setdefault(status, []).append(item_id)
+
+        now = now or timezone.now()
+        with transaction.atomic():
+            return sum(
+                self.filter(pk__in=item_ids).ubah_status(status, now=now, oleh=oleh)
+                for status, item_ids in per_status.items()
+            )
+
 
 # ==========================================
-# 4. TABEL ITEM (Detail Sepatu + Auto Compress)
+# 4. TABEL ITEM (Detail Sepatu + Antrian Kompres Foto)
 # ==========================================
 class OrderItem(models.Model):
     STATUS_CHOICES = [
@@ -140,6 +612,11 @@ class OrderItem(models.Model):
         ('READY', 'Selesai / Siap Ambil'),
         ('COMPLETED', 'Sudah Diambil'),
     ]
+    FOTO_STATUS_CHOICES = [
+        ('PENDING', 'Foto Sedang Diproses'),
+        ('READY', 'Foto Siap'),
+        ('FAILED', 'Gagal Proses Foto'),
+    ]
 
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
     service = models.ForeignKey(Service, on_delete=models.PROTECT)
@@ -148,36 +625,194 @@ class OrderItem(models.Model):
     catatan = models.TextField(blank=True)
     foto_sebelum = models.ImageField(upload_to='foto_sepatu/before/')
     foto_sesudah = models.ImageField(upload_to='foto_sepatu/after/', blank=True, null=True)
+
+    # Harga yang ditagih saat order masuk (snapshot), gak ikut berubah kalau harga Service naik
+    harga_saat_order = models.DecimalField(max_digits=10, decimal_places=0, null=True, blank=True)
     
     # Status Per Sepatu (Baru)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     tanggal_selesai_item = models.DateTimeField(null=True, blank=True)
+    # Kapan item masuk ke status sekarang (buat hitung lama di tiap status, lihat ItemStatusEvent)
+    status_sejak = models.DateTimeField(default=timezone.now, editable=False)
+
+    # Status kompres foto (antrian ImageJob)
+    foto_status = models.CharField(max_length=10, choices=FOTO_STATUS_CHOICES, default='READY', editable=False)
+    # Versi kecil tiap foto buat srcset, per field: lihat buat_turunan()
+    foto_turunan = models.JSONField(default=dict, blank=True, editable=False)
+
+    objects = OrderItemQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Dashboard: cari order yang masih punya item aktif (status IN ...)
+            models.Index(fields=['status', 'order'], name='orderitem_status_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.merk_sepatu} - {self.service.nama}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nilai awal tiap kolom: cek kolom yang berubah (save, total order) tanpa query ulang
+        instance._nilai_awal = instance._nilai_kolom()
+        return instance
+
+    def _nilai_kolom(self):
+        nilai = {}
+        deferred = self.get_deferred_fields()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            value = getattr(self, field.attname)
+            if isinstance(value, models.fields.files.FieldFile):
+                value = value.name
+            elif isinstance(value, (dict, list)):
+                value = copy.deepcopy(value)
+            nilai[field.attname] = value
+        return nilai
+
+    def kolom_berubah(self):
+        """Nama field yang nilainya beda dari saat di-load. None kalau instance belum pernah disimpan"""
+        awal = getattr(self, '_nilai_awal', None)
+        if awal is None:
+            return None
+        sekarang = self._nilai_kolom()
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in awal and sekarang.get(field.attname) != awal[field.attname]
+        ]
+
+    def turunan(self, field):
+        """Data turunan foto `field`, None kalau belum ada / sudah basi (fotonya diganti)"""
+        data = self.foto_turunan.get(field)
+        if data and data['sumber'] == getattr(self, field).name:
+            return data
+        return None
+
+    @classmethod
+    def simpan_turunan(cls, item_id, field, data):
+        """Simpan turunan 1 field tanpa menimpa field lain. Return data turunan lama"""
+        with transaction.atomic():
+            semua = cls.objects.select_for_update().filter(pk=item_id).values_list('foto_turunan', flat=True).first()
+            if semua is None:
+                return None
+            lama = semua.get(field)
+            semua[field] = data
+            cls.objects.filter(pk=item_id).update(foto_turunan=semua)
+        return lama
+
+    @classmethod
+    def tambah_banyak(cls, order, items):
+        """
+        Simpan banyak item baru sekaligus (input order): file foto mentah ditulis paralel
+        ke storage, lalu item & ImageJob masuk pakai bulk_create. Panggil di dalam
+        transaction.atomic(). save()/signal per item gak jalan, jadi harga snapshot,
+        status foto, total order & versi cache diurus di sini.
+        """
+        foto = [
+            (item, nama) for item in items for nama in ('foto_sebelum', 'foto_sesudah')
+            if getattr(item, nama) and not getattr(item, nama)._committed
+        ]
+
+        def simpan_foto(pasangan):
+            item, nama = pasangan
+            file = getattr(item, nama)
+            file.save(file.name, file.file, save=False)
+
+        try:
+            with profiling.span('img'), ThreadPoolExecutor(max_workers=settings.IMAGE_UPLOAD_WORKERS) as pool:
+                list(pool.map(simpan_foto, foto))
+
+            punya_foto = {id(item) for item, _ in foto}
+            for item in items:
+                item.order = order
+                if item.harga_saat_order is None:
+                    item.harga_saat_order = item.service.harga
+                if id(item) in punya_foto:
+                    item.foto_status = 'PENDING'
+            created = cls.objects.bulk_create(items)
+            ImageJob.objects.bulk_create([
+                ImageJob(item=item, field=nama, nama_file=getattr(item, nama).name) for item, nama in foto
+            ])
+            order.refresh_totals()
+        except Exception:
+            # Rollback DB gak ikut menghapus file yang sudah ditulis (yang gagal ditulis dilewati)
+            for item, nama in foto:
+                file = getattr(item, nama)
+                if file._committed:
+                    file.storage.delete(file.name)
+            raise
+
+        for item in created:
+            item._nilai_awal = item._nilai_kolom()
+        transaction.on_commit(bump_data_version)
+        transaction.on_commit(lambda: bump_order_version(order.pk))
+        return created
+
     def save(self, *args, **kwargs):
-        if self.foto_sebelum:
-            if not self.pk:
-                self.foto_sebelum = compress_image(self.foto_sebelum)
-            else:
-                try:
-                    old = OrderItem.objects.get(pk=self.pk)
-                    if old.foto_sebelum != self.foto_sebelum:
-                        self.foto_sebelum = compress_image(self.foto_sebelum)
-                except OrderItem.DoesNotExist:
-                    pass
-        if self.foto_sesudah:
-            if not self.pk:
-                 self.foto_sesudah = compress_image(self.foto_sesudah)
-            else:
-                try:
-                    old = OrderItem.objects.get(pk=self.pk)
-                    if old.foto_sesudah != self.foto_sesudah:
-                        self.foto_sesudah = compress_image(self.foto_sesudah)
-                except OrderItem.DoesNotExist:
-                    pass
-        super().save(*args, **kwargs)
+        if self.harga_saat_order is None and self.service_id:
+            self.harga_saat_order = self.service.harga
+
+        # Foto yang baru di-upload (belum ada di storage) disimpan mentah dulu,
+        # kompresnya dikerjakan worker `python manage.py process_images`
+        foto_baru = [
+            nama for nama in ('foto_sebelum', 'foto_sesudah')
+            if getattr(self, nama) and not getattr(self, nama)._committed
+        ]
+        if foto_baru:
+            self.foto_status = 'PENDING'
+            if 'update_fields' in kwargs:
+                kwargs['update_fields'] = {*kwargs['update_fields'], *foto_baru, 'foto_status'}
+
+        # Status berubah (admin / kode lain yang pakai save) -> dicatat juga di ItemStatusEvent
+        awal = getattr(self, '_nilai_awal', None)
+        transisi = None
+        if awal is not None and not self._state.adding and awal.get('status', self.status) != self.status:
+            waktu = timezone.now()
+            transisi = {
+                'pk': self.pk,
+                'service_id': self.service_id,
+                'status': awal['status'],
+                'status_sejak': awal.get('status_sejak') or waktu,
+                'order__tanggal_masuk': self.order.tanggal_masuk,
+            }
+            self.status_sejak = waktu
+            if 'update_fields' in kwargs and kwargs['update_fields'] is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'status_sejak'}
+
+        # Row lama: UPDATE cuma kolom yang berubah (ganti status = 1 UPDATE, gak berubah = 0 query),
+        # sekalian gak menimpa kolom foto yang baru diganti worker process_images
+        if awal is not None and not self._state.adding and 'update_fields' not in kwargs and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = self.kolom_berubah()
+
+        total_awal = (awal.get('order_id'), awal.get('harga_saat_order')) if awal else None
+        if foto_baru or transisi:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                for nama in foto_baru:
+                    ImageJob.objects.create(item=self, field=nama, nama_file=getattr(self, nama).name)
+                if transisi:
+                    ItemStatusEvent.catat([transisi], self.status, waktu, oleh=getattr(self, '_diubah_oleh', None))
+        else:
+            super().save(*args, **kwargs)
+
+        if awal is not None and kwargs.get('update_fields') is not None:
+            # Kolom yang gak ikut disimpan tetap dianggap berubah
+            disimpan = {self._meta.get_field(nama).attname for nama in kwargs['update_fields']}
+            sekarang = self._nilai_kolom()
+            self._nilai_awal = {**awal, **{k: v for k, v in sekarang.items() if k in disimpan}}
+        else:
+            self._nilai_awal = self._nilai_kolom()
+
+        # Item baru / pindah order / harga berubah -> total order ikut di-update
+        total_baru = (self.order_id, self.harga_saat_order)
+        if total_awal != total_baru:
+            self.order.refresh_totals()
+            if total_awal and total_awal[0] != self.order_id:
+                old_order = Order.objects.filter(pk=total_awal[0]).first()
+                if old_order:
+                    old_order.refresh_totals()
 
 # ==========================================
 # 5. TABEL PENGELUARAN (INI YANG HILANG TADI)
@@ -198,7 +833,542 @@ class Pengeluaran(models.Model):
     tanggal = models.DateTimeField(default=timezone.now)
     keterangan = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Analytics: pengeluaran per rentang tanggal (+ group by kategori)
+            models.Index(fields=['tanggal', 'kategori'], name='pengeluaran_tanggal_kat_idx'),
+        ]
+
     def __str__(self):
         if self.sub_kategori:
             return f"{self.nama_pengeluaran} ({self.sub_kategori}) - Rp {self.biaya}"
-        return f"{self.nama_pengeluaran} - Rp {self.biaya}"
\ No newline at end of file
+        return f"{self.nama_pengeluaran} - Rp {self.biaya}"
+
+# ==========================================
+# 6. ROLLUP OMZET HARIAN (Buat Analytics)
+# ==========================================
+class DailyRevenue(models.Model):
+    """
+    Ringkasan omzet per hari per metode bayar, dari order COMPLETED.
+    Di-update otomatis tiap Order.save() yang mengubah status lunas,
+    bisa di-backfill ulang pakai `python manage.py rebuild_rollups`.
+    """
+    tanggal = models.DateField()
+    metode_pembayaran = models.CharField(max_length=20, choices=Order.PAYMENT_CHOICES)
+    omzet = models.DecimalField(max_digits=14, decimal_places=0, default=0)
+    jumlah_order = models.PositiveIntegerField(default=0)
+    jumlah_item = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tanggal', 'metode_pembayaran'], name='unique_daily_revenue'),
+        ]
+        ordering = ['tanggal', 'metode_pembayaran']
+
+    def __str__(self):
+        return f"{self.tanggal} {self.metode_pembayaran} - Rp {self.omzet}"
+
+    @classmethod
+    def pindahkan_order(cls, order, key_lama, key_baru):
+        """Kurangi kontribusi order dari key_lama, tambahkan ke key_baru"""
+        omzet = order.total_harga
+        jumlah_item = order.jumlah_item
+        if key_lama:
+            cls._tambah(key_lama, -omzet, -1, -jumlah_item)
+        if key_baru:
+            cls._tambah(key_baru, omzet, 1, jumlah_item)
+
+    @classmethod
+    def _tambah(cls, key, omzet, jumlah_order, jumlah_item):
+        tanggal, metode = key
+        row, _ = cls.objects.get_or_create(tanggal=tanggal, metode_pembayaran=metode)
+        cls.objects.filter(pk=row.pk).update(
+            omzet=F('omzet') + omzet,
+            jumlah_order=F('jumlah_order') + jumlah_order,
+            jumlah_item=F('jumlah_item') + jumlah_item,
+        )
+        if jumlah_order < 0:
+            # Order terakhir di hari & metode ini keluar -> barisnya dihapus, sama dengan hasil rebuild()
+            cls.objects.filter(pk=row.pk, jumlah_order=0).delete()
+
+    @classmethod
+    def series(cls, start_date, end_date):
+        """
+        Omzet & jumlah item per hari untuk start_date..end_date (inklusif).
+        1 query GROUP BY tanggal, hari tanpa transaksi diisi 0 di Python,
+        jadi jumlah query gak tergantung panjang rentang.
+        """
+        per_hari = {
+            row['tanggal']: row
+            for row in cls.objects.filter(tanggal__gte=start_date, tanggal__lte=end_date)
+            .values('tanggal').annotate(omzet_hari=Sum('omzet'), item_hari=Sum('jumlah_item'))
+            .order_by()
+        }
+        hasil = []
+        for offset in range((end_date - start_date).days + 1):
+            tanggal = start_date + timezone.timedelta(days=offset)
+            row = per_hari.get(tanggal, {})
+            hasil.append({
+                'tanggal': tanggal,
+                'omzet': int(row.get('omzet_hari') or 0),
+                'item_count': row.get('item_hari') or 0,
+            })
+        return hasil
+
+    @classmethod
+    def rebuild(cls):
+        """Hitung ulang semua rollup dari data order (1 query GROUP BY). Return jumlah baris"""
+        grouped = (
+            Order.objects.filter(status='COMPLETED', tanggal_selesai__isnull=False)
+            .annotate(hari=TruncDate('tanggal_selesai', tzinfo=timezone.get_current_timezone()))
+            .values('hari', 'metode_pembayaran')
+            .annotate(
+                total_omzet=Sum('total_harga'),
+                total_order=Count('id'),
+                total_item=Sum('jumlah_item'),
+            )
+            .order_by()
+        )
+        rows = [
+            cls(
+                tanggal=row['hari'],
+                metode_pembayaran=row['metode_pembayaran'],
+                omzet=row['total_omzet'] or 0,
+                jumlah_order=row['total_order'],
+                jumlah_item=row['total_item'] or 0,
+            )
+            for row in grouped
+        ]
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
+
+# ==========================================
+# 7. ANTRIAN KOMPRES FOTO (Tanpa Broker)
+# ==========================================
+class ImageJob(models.Model):
+    """
+    1 baris = 1 foto mentah yang perlu dikompres.
+    Diisi OrderItem.save() tiap ada upload baru, dikerjakan `python manage.py process_images`.
+    Job RUNNING yang gak selesai (worker mati/restart) diambil ulang setelah LOCK_TIMEOUT,
+    job yang error dicoba lagi dengan jeda makin panjang sampai MAX_ATTEMPTS.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Menunggu'),
+        ('RUNNING', 'Diproses'),
+        ('DONE', 'Selesai'),
+        ('FAILED', 'Gagal'),
+    ]
+    FIELD_CHOICES = [
+        ('foto_sebelum', 'Foto Sebelum'),
+        ('foto_sesudah', 'Foto Sesudah'),
+    ]
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY = timezone.timedelta(seconds=30)
+    LOCK_TIMEOUT = timezone.timedelta(minutes=10)
+
+    item = models.ForeignKey(OrderItem, related_name='image_jobs', on_delete=models.CASCADE)
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    nama_file = models.CharField(max_length=255)  # file mentah yang harus dikompres
+    hasil_file = models.CharField(max_length=255, blank=True)  # hasil kompres yang sudah dipasang ke item
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Worker: ambil job PENDING yang sudah waktunya (status + available_at)
+            models.Index(fields=['status', 'available_at'], name='imagejob_status_avail_idx'),
+        ]
+        ordering = ['available_at', 'id']
+
+    def __str__(self):
+        return f"#{self.item_id} {self.field} - {self.status}"
+
+    @classmethod
+    def claim(cls, limit=10, now=None):
+        """
+        Ambil maksimal `limit` job buat dikerjakan worker ini.
+        Tiap job dikunci pakai UPDATE bersyarat, jadi 2 worker gak akan dapat job yang sama.
+        Job RUNNING basi yang sudah MAX_ATTEMPTS kali diambil gak diambil lagi, tapi di-FAILED-kan
+        (foto yang bikin worker mati, mis. kehabisan RAM, gak akan pernah sampai ke _gagal).
+        """
+        now = now or timezone.now()
+        basi = Q(status='RUNNING', locked_at__lt=now - cls.LOCK_TIMEOUT)
+        mati = list(cls.objects.filter(basi, attempts__gte=cls.MAX_ATTEMPTS))
+        if mati:
+            cls.objects.filter(basi, pk__in=[job.pk for job in mati]).update(
+                status='FAILED', locked_at=None,
+                last_error=f'Worker mati saat memproses job ({cls.MAX_ATTEMPTS}x percobaan)',
+            )
+            for job in mati:
+                job._perbarui_foto_status()
+
+        kandidat = cls.objects.filter(
+            Q(status='PENDING', available_at__lte=now) | (basi & Q(attempts__lt=cls.MAX_ATTEMPTS))
+        ).values_list('pk', 'status', 'locked_at')[:limit]
+
+        diambil = []
+        for pk, status, locked_at in kandidat:
+            dikunci = cls.objects.filter(pk=pk, status=status, locked_at=locked_at).update(
+                status='RUNNING', locked_at=now, attempts=F('attempts') + 1
+            )
+            if dikunci:
+                diambil.append(pk)
+        return list(cls.objects.filter(pk__in=diambil))
+
+    @classmethod
+    def requeue_failed(cls):
+        """Job FAILED dicoba lagi dari awal. Return jumlah job"""
+        item_ids = list(cls.objects.filter(status='FAILED').values_list('item_id', flat=True))
+        jumlah = cls.objects.filter(status='FAILED').update(
+            status='PENDING', attempts=0, available_at=timezone.now(), locked_at=None
+        )
+        OrderItem.objects.filter(pk__in=item_ids).update(foto_status='PENDING')
+        return jumlah
+
+    def process(self):
+        """Kompres foto lalu ganti file item di tempat. Return True kalau sukses"""
+        try:
+            self._kompres()
+        except Exception as exc:
+            self._gagal(exc)
+            return False
+        ImageJob.objects.filter(pk=self.pk).update(status='DONE', locked_at=None, last_error='')
+        self._perbarui_foto_status()
+        return True
+
+    def _kompres(self):
+        item = OrderItem.objects.filter(pk=self.item_id).first()
+        if item is None:
+            return
+        foto = getattr(item, self.field)
+        if self.hasil_file and foto.name == self.hasil_file:
+            # Sudah dikompres & dipasang, tapi job belum DONE (worker mati / turunan gagal):
+            # gak dikompres ulang, file mentah yang mungkin tersisa dibuang, lanjut ke turunan
+            if self.nama_file != foto.name:
+                foto.storage.delete(self.nama_file)
+        elif foto.name != self.nama_file:
+            # Foto sudah diganti upload baru, job yang lebih baru yang akan memprosesnya
+            return
+        else:
+            with foto.open('rb'):
+                hasil = compress_image(foto)
+            foto.save(os.path.basename(hasil.name), hasil, save=False)
+
+            # Ganti nama file cuma kalau item masih pegang file mentah yang sama,
+            # sekalian dicatat di job biar percobaan berikutnya tahu fotonya sudah dikompres
+            with transaction.atomic():
+                diganti = OrderItem.objects.filter(pk=item.pk, **{self.field: self.nama_file}).update(
+                    **{self.field: foto.name}
+                )
+                if diganti:
+                    ImageJob.objects.filter(pk=self.pk).update(hasil_file=foto.name)
+            if not diganti:
+                foto.storage.delete(foto.name)
+                return
+            self.hasil_file = foto.name
+            if self.nama_file != foto.name:
+                foto.storage.delete(self.nama_file)
+
+        # Versi kecil buat srcset (dashboard, detail); turunan foto sebelumnya dibuang
+        if item.turunan(self.field) is None:
+            lama = OrderItem.simpan_turunan(item.pk, self.field, buat_turunan(foto))
+            hapus_turunan(foto.storage, lama)
+
+    def _gagal(self, exc):
+        self.last_error = f'{type(exc).__name__}: {exc}'
+        # File bukan gambar / kebesaran: dicoba ulang pun hasilnya sama
+        permanen = isinstance(exc, (Image.DecompressionBombError, UnidentifiedImageError))
+        if permanen or self.attempts >= self.MAX_ATTEMPTS:
+            self.status = 'FAILED'
+        else:
+            self.status = 'PENDING'
+            # Jeda makin lama: 30 detik, 1 menit, 2 menit, ...
+            self.available_at = timezone.now() + self.RETRY_DELAY * 2 ** (self.attempts - 1)
+        ImageJob.objects.filter(pk=self.pk).update(
+            status=self.status, available_at=self.available_at, last_error=self.last_error, locked_at=None
+        )
+        self._perbarui_foto_status()
+
+    def _perbarui_foto_status(self):
+        jobs = ImageJob.objects.filter(item_id=self.item_id).aggregate(
+            aktif=Count('id', filter=Q(status__in=['PENDING', 'RUNNING'])),
+            gagal=Count('id', filter=Q(status='FAILED')),
+        )
+        if jobs['aktif']:
+            foto_status = 'PENDING'
+        elif jobs['gagal']:
+            foto_status = 'FAILED'
+        else:
+            foto_status = 'READY'
+        OrderItem.objects.filter(pk=self.item_id).update(foto_status=foto_status)
+        # Update lewat queryset gak kirim signal, versi tracking order dinaikkan manual (setelah commit).
+        # (versinya di DB, jadi server web ikut tahu walau worker = proses lain)
+        order_id = OrderItem.objects.filter(pk=self.item_id).values_list('order_id', flat=True).first()
+        if order_id:
+            transaction.on_commit(lambda: bump_order_version(order_id))
+
+
+# ==========================================
+# 8. LOG STATUS ITEM + METRIK PENGERJAAN HARIAN
+# ==========================================
+# Batas atas bucket histogram turnaround (jam). Bucket terakhir (index len) = lebih dari itu
+TURNAROUND_BUCKETS_JAM = (2, 4, 8, 12, 24, 36, 48, 72, 96, 120, 168, 240, 336)
+_TURNAROUND_BATAS_DETIK = [jam * 3600 for jam in TURNAROUND_BUCKETS_JAM]
+
+
+def bucket_turnaround(detik):
+    """Index bucket histogram untuk turnaround `detik`"""
+    return bisect.bisect_left(_TURNAROUND_BATAS_DETIK, detik)
+
+
+def tambah_rollup(model, key_fields, perubahan):
+    """
+    Tambah angka di banyak baris rollup sekaligus: {key tuple: {kolom: tambahan}}.
+    Berapapun jumlah key cuma 3 query: INSERT baris yang belum ada (abaikan yang sudah ada,
+    butuh unique constraint di key_fields), SELECT id-nya, 1 UPDATE kolom + CASE per id.
+    """
+    if not perubahan:
+        return
+    model.objects.bulk_create(
+        [model(**dict(zip(key_fields, key))) for key in perubahan], ignore_conflicts=True,
+    )
+    ids = _id_rollup(model, key_fields, perubahan)
+    kolom = next(iter(perubahan.values())).keys()
+    model.objects.filter(pk__in=ids.values()).update(**{
+        nama: F(nama) + Case(
+            *[When(pk=ids[key], then=Value(tambahan[nama])) for key, tambahan in perubahan.items()],
+            default=Value(0), output_field=model._meta.get_field(nama),
+        )
+        for nama in kolom
+    })
+
+
+def kurangi_rollup(model, key_fields, perubahan, kolom_jumlah='jumlah'):
+    """
+    Kebalikan tambah_rollup: {key tuple: {kolom: pengurang}}. Cuma baris yang sudah ada yang
+    dikurangi (gak pernah minus), baris yang jumlahnya jadi 0 dihapus, sama seperti hasil rebuild
+    """
+    if not perubahan:
+        return
+    ids = _id_rollup(model, key_fields, perubahan)
+    if not ids:
+        return
+    kolom = next(iter(perubahan.values())).keys()
+    model.objects.filter(pk__in=ids.values()).update(**{
+        nama: Greatest(F(nama) - Case(
+            *[When(pk=ids[key], then=Value(perubahan[key][nama])) for key in ids],
+            default=Value(0), output_field=model._meta.get_field(nama),
+        ), Value(0))
+        for nama in kolom
+    })
+    model.objects.filter(pk__in=ids.values(), **{kolom_jumlah: 0}).delete()
+
+
+def _id_rollup(model, key_fields, keys):
+    """{key tuple: pk} baris rollup yang sudah ada, 1 SELECT"""
+    cari = Q()
+    for key in keys:
+        cari |= Q(**dict(zip(key_fields, key)))
+    return {
+        tuple(row[f] for f in key_fields): row['pk']
+        for row in model.objects.filter(cari).values('pk', *key_fields)
+    }
+
+
+class ItemStatusEvent(models.Model):
+    """
+    Log perpindahan status item (append-only, gak pernah di-update).
+    Ditulis ubah_status() (detail_order, lunasi_order, aksi massal dashboard) dan OrderItem.save() (admin).
+    Sekalian menambah rollup ItemStatusHarian & TurnaroundHarian, jadi halaman metrik
+    cukup baca rollup; item dihapus -> dikurangi lagi (keluarkan_dari_rollup).
+    `python manage.py rebuild_rollups` menghitung ulang rollup dari log ini.
+    """
+    item = models.ForeignKey(OrderItem, related_name='status_events', on_delete=models.CASCADE)
+    status_lama = models.CharField(max_length=20, choices=OrderItem.STATUS_CHOICES)
+    status_baru = models.CharField(max_length=20, choices=OrderItem.STATUS_CHOICES)
+    waktu = models.DateTimeField(default=timezone.now)
+    oleh = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    # Lama item di status_lama
+    durasi_detik = models.PositiveIntegerField(default=0)
+    # Order masuk -> item selesai (cuma diisi waktu item pertama kali masuk READY / COMPLETED)
+    turnaround_detik = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'waktu'], name='statusevent_item_waktu_idx'),
+            models.Index(fields=['waktu'], name='statusevent_waktu_idx'),
+        ]
+
+    def __str__(self):
+        return f"Item #{self.item_id}: {self.status_lama} -> {self.status_baru}"
+
+    @classmethod
+    def catat(cls, transisi, status_baru, waktu, oleh=None):
+        """
+        Simpan event + tambah rollup. `transisi` = list dict kolom TRANSISI_FIELDS
+        (nilai SEBELUM status diganti). 1 bulk INSERT + 2 query per key rollup.
+        """
+        if oleh is not None and not oleh.is_authenticated:
+            oleh = None
+        teknisi = oleh.get_username() if oleh else ''
+
+        baris = []
+        for t in transisi:
+            turnaround = None
+            if status_baru in SELESAI_STATUSES and t['status'] not in SELESAI_STATUSES:
+                turnaround = max(int((waktu - t['order__tanggal_masuk']).total_seconds()), 0)
+            baris.append(cls(
+                item_id=t['pk'],
+                status_lama=t['status'],
+                status_baru=status_baru,
+                waktu=waktu,
+                oleh=oleh,
+                durasi_detik=max(int((waktu - t['status_sejak']).total_seconds()), 0),
+                turnaround_detik=turnaround,
+            ))
+
+        per_status, per_bucket = cls._kelompokkan(
+            (e.waktu, t['service_id'], e.status_lama, e.status_baru, teknisi, e.durasi_detik, e.turnaround_detik)
+            for e, t in zip(baris, transisi)
+        )
+        with transaction.atomic():
+            cls.objects.bulk_create(baris)
+            tambah_rollup(ItemStatusHarian, ItemStatusHarian.KEY_FIELDS, {
+                key: {'jumlah': jumlah, 'total_durasi_detik': total} for key, (jumlah, total) in per_status.items()
+            })
+            tambah_rollup(TurnaroundHarian, TurnaroundHarian.KEY_FIELDS, {
+                key: {'jumlah': jumlah, 'total_detik': total} for key, (jumlah, total) in per_bucket.items()
+            })
+        return baris
+
+    @staticmethod
+    def _kelompokkan(rows):
+        """
+        rows: (waktu, service_id, status_lama, status_baru, teknisi, durasi_detik, turnaround_detik)
+        -> ({key ItemStatusHarian: [jumlah, total]}, {key TurnaroundHarian: [jumlah, total]})
+        """
+        per_status, per_bucket = {}, {}
+        for waktu, service_id, status_lama, status_baru, teknisi, durasi, turnaround in rows:
+            tanggal = timezone.localdate(waktu)
+            row = per_status.setdefault((tanggal, service_id, status_lama, status_baru, teknisi), [0, 0])
+            row[0] += 1
+            row[1] += durasi
+            if turnaround is not None:
+                row = per_bucket.setdefault((tanggal, service_id, bucket_turnaround(turnaround)), [0, 0])
+                row[0] += 1
+                row[1] += turnaround
+        return per_status, per_bucket
+
+    ROLLUP_FIELDS = (
+        'waktu', 'item__service_id', 'status_lama', 'status_baru', 'oleh__username', 'durasi_detik', 'turnaround_detik',
+    )
+
+    @classmethod
+    def keluarkan_dari_rollup(cls, item_ids):
+        """
+        Item mau dihapus (event-nya ikut kehapus CASCADE) -> kontribusinya di ItemStatusHarian &
+        TurnaroundHarian dikurangi. Dipanggil signal pre_delete OrderItem, di dalam transaksi delete
+        """
+        per_status, per_bucket = cls._kelompokkan(
+            (*row[:4], row[4] or '', *row[5:])
+            for row in cls.objects.filter(item_id__in=item_ids).values_list(*cls.ROLLUP_FIELDS).order_by()
+        )
+        kurangi_rollup(ItemStatusHarian, ItemStatusHarian.KEY_FIELDS, {
+            key: {'jumlah': jumlah, 'total_durasi_detik': total} for key, (jumlah, total) in per_status.items()
+        })
+        kurangi_rollup(TurnaroundHarian, TurnaroundHarian.KEY_FIELDS, {
+            key: {'jumlah': jumlah, 'total_detik': total} for key, (jumlah, total) in per_bucket.items()
+        })
+
+    @classmethod
+    def rebuild_metrics(cls):
+        """Hitung ulang ItemStatusHarian & TurnaroundHarian dari log. Return (baris status, baris turnaround)"""
+        per_status, per_bucket = cls._kelompokkan(
+            cls.objects.values_list(*cls.ROLLUP_FIELDS).order_by().iterator(chunk_size=2000)
+        )
+        status_rows = [
+            ItemStatusHarian(
+                tanggal=tanggal, service_id=service_id, status_lama=status_lama,
+                status_baru=status_baru, teknisi=teknisi or '', jumlah=jumlah, total_durasi_detik=total,
+            )
+            for (tanggal, service_id, status_lama, status_baru, teknisi), (jumlah, total) in per_status.items()
+        ]
+        bucket_rows = [
+            TurnaroundHarian(tanggal=tanggal, service_id=service_id, bucket=bucket, jumlah=jumlah, total_detik=total)
+            for (tanggal, service_id, bucket), (jumlah, total) in per_bucket.items()
+        ]
+        with transaction.atomic():
+            ItemStatusHarian.objects.all().delete()
+            TurnaroundHarian.objects.all().delete()
+            ItemStatusHarian.objects.bulk_create(status_rows, batch_size=500)
+            TurnaroundHarian.objects.bulk_create(bucket_rows, batch_size=500)
+        return len(status_rows), len(bucket_rows)
+
+
+class ItemStatusHarian(models.Model):
+    """Rollup per hari x service x perpindahan status x teknisi: jumlah & total lama di status_lama"""
+    KEY_FIELDS = ('tanggal', 'service_id', 'status_lama', 'status_baru', 'teknisi')
+
+    tanggal = models.DateField()
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='+')
+    status_lama = models.CharField(max_length=20, choices=OrderItem.STATUS_CHOICES)
+    status_baru = models.CharField(max_length=20, choices=OrderItem.STATUS_CHOICES)
+    teknisi = models.CharField(max_length=150, blank=True)  # username, kosong = sistem / tanpa user
+    jumlah = models.PositiveIntegerField(default=0)
+    total_durasi_detik = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tanggal', 'service', 'status_lama', 'status_baru', 'teknisi'],
+                name='unique_item_status_harian',
+            ),
+        ]
+        ordering = ['tanggal']
+
+    def __str__(self):
+        return f"{self.tanggal} {self.status_lama}->{self.status_baru} ({self.jumlah}x)"
+
+
+class TurnaroundHarian(models.Model):
+    """Histogram turnaround (order masuk -> item selesai) per hari selesai x service, buat persentil"""
+    KEY_FIELDS = ('tanggal', 'service_id', 'bucket')
+
+    tanggal = models.DateField()
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='+')
+    bucket = models.PositiveSmallIntegerField()  # index TURNAROUND_BUCKETS_JAM
+    jumlah = models.PositiveIntegerField(default=0)
+    total_detik = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tanggal', 'service', 'bucket'], name='unique_turnaround_harian'),
+        ]
+        ordering = ['tanggal', 'bucket']
+
+    def __str__(self):
+        return f"{self.tanggal} bucket {self.bucket} ({self.jumlah}x)"
+
+
+# ==========================================
+# 9. VERSI DATA (buat invalidasi cache, lihat caching.py)
+# ==========================================
+class VersiData(models.Model):
+    """
+    Penanda versi (waktu perubahan terakhir, time_ns) buat ETag & key cache.
+    Disimpan di DB biar sama di semua proses, apa pun backend cache-nya.
+    """
+    kunci = models.CharField(max_length=50, primary_key=True)
+    versi = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.kunci} = {self.versi}"
@@ -0,0 +1,214 @@
+"""
+Profiling request (opt-in): SQL, render template, kerja gambar & total waktu per request.
+
+Aktif kalau SOLECLEAN_PROFILING=1 (settings.PROFILING_ENABLED). Kalau mati, middleware
+raise MiddlewareNotUsed waktu start -> dibuang dari rantai middleware, template gak di-patch,
+span() cuma cek 1 ContextVar. Jadi overhead waktu mati praktis nol.
+
+Kalau aktif, tiap request:
+- header Server-Timing: sql / tpl / img / total (kelihatan di tab Network browser)
+- request lebih lambat dari PROFILING_SLOW_MS ditulis (JSON per baris) ke logger
+  'operasional.slow_requests' + query teratas. File-nya (PROFILING_SLOW_LOG, RotatingFileHandler)
+  dipasang middleware waktu start, jadi path-nya selalu ikut settings yang berlaku
+- PROFILING_HISTORY request terakhir disimpan di memori proses buat halaman staff `profiling_report`
+"""
+import json
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('operasional.slow_requests')
+
+_profil = ContextVar('soleclean_profil', default=None)
+
+# Request terakhir (per proses), diisi middleware, dibaca halaman profiling_report
+_riwayat = deque(maxlen=settings.PROFILING_HISTORY)
+_riwayat_lock = threading.Lock()
+
+
+class Profil:
+    __slots__ = ('queries', 'sql_detik', 'template_detik', 'template_depth', 'spans')
+
+    def __init__(self):
+        self.queries = []  # (sql, detik)
+        self.sql_detik = 0.0
+        self.template_detik = 0.0
+        self.template_depth = 0
+        self.spans = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper: catat tiap query"""
+        mulai = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            durasi = time.perf_counter() - mulai
+            self.sql_detik += durasi
+            self.queries.append((sql, durasi))
+
+    def duplikat(self):
+        """Kelompok query dengan SQL sama (parameter beda) yang jalan >1x: [(jumlah, sql)]"""
+        pola = Counter(normalisasi_sql(sql) for sql, _ in self.queries)
+        return [(jumlah, sql) for sql, jumlah in pola.most_common() if jumlah > 1]
+
+
+def normalisasi_sql(sql):
+    return re.sub(r"'[^']*'|\b\d+\b", '?', sql)
+
+
+@contextmanager
+def span(nama):
+    """Ukur potongan kerja (mis. 'img') di request yang sedang diprofil. No-op kalau profiling mati"""
+    profil = _profil.get()
+    if profil is None:
+        yield
+        return
+    mulai = time.perf_counter()
+    try:
+        yield
+    finally:
+        profil.spans[nama] = profil.spans.get(nama, 0.0) + time.perf_counter() - mulai
+
+
+def _pasang_timer_template():
+    """Patch Template.render sekali: hitung waktu render template terluar (include gak dobel)"""
+    from django.template.base import Template
+
+    if getattr(Template.render, '_soleclean_profil', False):
+        return
+    render_asli = Template.render
+
+    def render(self, context):
+        profil = _profil.get()
+        if profil is None:
+            return render_asli(self, context)
+        profil.template_depth += 1
+        mulai = time.perf_counter()
+        try:
+            return render_asli(self, context)
+        finally:
+            profil.template_depth -= 1
+            if not profil.template_depth:
+                profil.template_detik += time.perf_counter() - mulai
+
+    render._soleclean_profil = True
+    Template.render = render
+
+
+def _pasang_log_lambat(path):
+    """RotatingFileHandler logger request lambat ke `path` (handler lama dari middleware sebelumnya diganti)"""
+    path = os.path.abspath(path)
+    for handler in list(logger.handlers):
+        if getattr(handler, '_soleclean_profil', False):
+            if handler.baseFilename == path:
+                return
+            logger.removeHandler(handler)
+            handler.close()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=settings.PROFILING_SLOW_LOG_BYTES, backupCount=settings.PROFILING_SLOW_LOG_BACKUPS,
+        delay=True,  # file baru dibuat waktu ada request lambat pertama
+    )
+    handler._soleclean_profil = True
+    logger.addHandler(handler)
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+
+
+def riwayat():
+    with _riwayat_lock:
+        return list(_riwayat)
+
+
+def ringkas_endpoint(rows):
+    """Kelompokkan riwayat per endpoint, urut p95 total paling lambat"""
+    per_endpoint = {}
+    for row in rows:
+        per_endpoint.setdefault((row['method'], row['endpoint']), []).append(row)
+
+    hasil = []
+    for (method, endpoint), items in per_endpoint.items():
+        total = sorted(item['total_ms'] for item in items)
+        hasil.append({
+            'method': method,
+            'endpoint': endpoint,
+            'jumlah': len(items),
+            'p50_ms': total[len(total) // 2],
+            'p95_ms': total[min(int(len(total) * 0.95), len(total) - 1)],
+            'max_ms': total[-1],
+            'rata_sql_ms': round(sum(item['sql_ms'] for item in items) / len(items), 1),
+            'rata_query': round(sum(item['queries'] for item in items) / len(items), 1),
+            'rata_template_ms': round(sum(item['template_ms'] for item in items) / len(items), 1),
+        })
+    return sorted(hasil, key=lambda row: -row['p95_ms'])
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed('Profiling mati (SOLECLEAN_PROFILING)')
+        self.get_response = get_response
+        _pasang_log_lambat(settings.PROFILING_SLOW_LOG)
+        _pasang_timer_template()
+
+    def __call__(self, request):
+        profil = Profil()
+        token = _profil.set(profil)
+        mulai = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profil))
+                response = self.get_response(request)
+        finally:
+            _profil.reset(token)
+        total_detik = time.perf_counter() - mulai
+
+        data = self.catat(request, response, profil, total_detik)
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={data["sql_ms"]};desc="{data["queries"]} query, {data["duplikat"]} grup duplikat"',
+            f'tpl;dur={data["template_ms"]};desc="template"',
+            *[f'{nama};dur={ms}' for nama, ms in data['spans'].items()],
+            f'total;dur={data["total_ms"]}',
+        ])
+        return response
+
+    def catat(self, request, response, profil, total_detik):
+        match = getattr(request, 'resolver_match', None)
+        data = {
+            'waktu': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': (match.view_name if match else None) or request.path,
+            'status': response.status_code,
+            'total_ms': round(total_detik * 1000, 1),
+            'sql_ms': round(profil.sql_detik * 1000, 1),
+            'queries': len(profil.queries),
+            'duplikat': len(profil.duplikat()),
+            'template_ms': round(profil.template_detik * 1000, 1),
+            'spans': {nama: round(detik * 1000, 1) for nama, detik in profil.spans.items()},
+        }
+        with _riwayat_lock:
+            _riwayat.append(data)
+
+        if data['total_ms'] >= settings.PROFILING_SLOW_MS:
+            terlama = sorted(profil.queries, key=lambda q: -q[1])[:settings.PROFILING_TOP_QUERIES]
+            logger.warning(json.dumps(dict(
+                data,
+                top_queries=[{'ms': round(detik * 1000, 2), 'sql': sql} for sql, detik in terlama],
+                duplikat_queries=[
+                    {'jumlah': jumlah, 'sql': sql}
+                    for jumlah, sql in profil.duplikat()[:settings.PROFILING_TOP_QUERIES]
+                ],
+            )))
+        return data
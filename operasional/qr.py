@@ -0,0 +1,44 @@
+"""
+QR code link tracking order (dicetak di struk).
+
+Link tracking satu order gak pernah berubah, jadi gambar QR cukup dibuat sekali
+lalu disimpan di cache (key = isi QR + format). Format:
+- svg: vektor murni Python, gak lewat rasterisasi PIL (default struk)
+- png: buat printer / aplikasi yang gak bisa SVG
+"""
+import hashlib
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.core.cache import cache
+
+from .profiling import span
+
+QR_FORMATS = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png',
+}
+
+
+def qr_etag(data, fmt):
+    return '"%s"' % hashlib.md5(f'{fmt}:{data}'.encode()).hexdigest()
+
+
+def qr_image(data, fmt='svg'):
+    """Bytes gambar QR untuk `data`, dibuat sekali lalu diambil dari cache"""
+    cache_key = f'qr:{fmt}:{hashlib.md5(data.encode()).hexdigest()}'
+    image = cache.get(cache_key)
+    if image is None:
+        with span('img'):
+            qr = qrcode.QRCode(box_size=4, border=1)  # Ukuran dikecilin dikit biar muat
+            qr.add_data(data)
+            qr.make(fit=True)
+            buffer = BytesIO()
+            if fmt == 'svg':
+                qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+            else:
+                qr.make_image(fill='black', back_color='white').save(buffer, format='PNG')
+            image = buffer.getvalue()
+        cache.set(cache_key, image, timeout=None)
+    return image
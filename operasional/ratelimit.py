@@ -0,0 +1,56 @@
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+
+def client_ip(request):
+    # REMOTE_ADDR saja: X-Forwarded-For gampang dipalsukan kalau gak di belakang proxy terpercaya
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _tolak(request, scope):
+    """Response 429 kalau IP ini sudah lewat batas scope, None kalau masih boleh"""
+    limit, window = settings.RATE_LIMITS[scope]
+    slot = int(time.time() // window)
+    key = f'ratelimit:{scope}:{client_ip(request)}:{slot}'
+    cache.add(key, 0, timeout=window)
+    try:
+        hits = cache.incr(key)
+    except ValueError:
+        # Key ke-evict di antara add & incr: anggap request pertama
+        hits = 1
+    if hits > limit:
+        response = HttpResponse('Terlalu banyak request, coba lagi sebentar.', status=429)
+        response['Retry-After'] = str(window - int(time.time()) % window)
+        return response
+    return None
+
+
+def ratelimit(scope):
+    """
+    Batasi request per IP (fixed window di cache), setting RATE_LIMITS[scope] = (jumlah, detik).
+    Lewat batas -> 429 + Retry-After, jadi refresh beruntun di halaman publik
+    gak menghabiskan worker yang dipakai staf. Bisa dipakai di view sync maupun async (SSE).
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                response = await sync_to_async(_tolak)(request, scope)
+                if response is not None:
+                    return response
+                return await view_func(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = _tolak(request, scope)
+            if response is not None:
+                return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,67 @@
+"""
+Role RBAC user (nama Group), dihitung sekali per request.
+
+user_roles(user) nyimpen hasilnya di objek user (request.user sama untuk 1 request),
+jadi is_admin / is_supervisor / is_teknisi / can_add_order & template cuma cek set,
+tanpa query tambahan. Antar request disimpan di cache (RBAC_ROLE_CACHE_TIMEOUT);
+versinya dinaikkan tiap keanggotaan group / group berubah (lihat signals.py).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+ROLES_VERSION_KEY = 'operasional:roles_version'
+
+
+def _roles_version():
+    version = cache.get(ROLES_VERSION_KEY)
+    if version is None:
+        cache.add(ROLES_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(ROLES_VERSION_KEY)
+    return version
+
+
+def bump_roles_version():
+    cache.set(ROLES_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def user_roles(user):
+    """frozenset nama group user, memo di objek user"""
+    roles = getattr(user, '_rbac_roles', None)
+    if roles is not None:
+        return roles
+
+    if not user.is_authenticated:
+        roles = frozenset()
+    elif settings.RBAC_ROLE_CACHE_TIMEOUT:
+        cache_key = f'operasional:roles:{_roles_version()}:{user.pk}'
+        roles = cache.get(cache_key)
+        if roles is None:
+            roles = frozenset(user.groups.values_list('name', flat=True))
+            cache.set(cache_key, roles, settings.RBAC_ROLE_CACHE_TIMEOUT)
+    else:
+        roles = frozenset(user.groups.values_list('name', flat=True))
+
+    user._rbac_roles = roles
+    return roles
+
+
+# ==========================================
+# RBAC HELPER FUNCTIONS
+# ==========================================
+def is_admin(user):
+    """Check if user is in Admin group"""
+    return user.is_staff or 'Admin' in user_roles(user)
+
+def is_supervisor(user):
+    """Check if user is in Supervisor group"""
+    return not user_roles(user).isdisjoint({'Supervisor', 'Admin'})
+
+def is_teknisi(user):
+    """Check if user is in Teknisi group"""
+    return not user_roles(user).isdisjoint({'Teknisi', 'Admin'})
+
+def can_add_order(user):
+    """Supervisor, Teknisi or Admin can add orders"""
+    return is_admin(user) or is_supervisor(user) or is_teknisi(user)
@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import events
+from .caching import bump_data_version, bump_order_version, delete_order_version
+from .roles import bump_roles_version
+from .models import ItemStatusEvent, Order, OrderItem, Pengeluaran, hapus_turunan_item
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+@receiver(post_save, sender=Pengeluaran)
+@receiver(post_delete, sender=Pengeluaran)
+def invalidate_data_cache(sender, **kwargs):
+    """
+    Data berubah -> naikkan versi setelah commit, cache analytics lama otomatis basi.
+    Kalau dinaikkan sebelum commit, request lain bisa nyimpan angka lama di versi baru
+    """
+    transaction.on_commit(bump_data_version)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def invalidate_tracking_cache(sender, instance, signal, **kwargs):
+    """
+    Order / item berubah -> halaman tracking order itu di-render ulang. Versi baru dipasang
+    setelah commit: kalau sebelumnya, request lain bisa nyimpan halaman lama di versi baru
+    """
+    if sender is Order and signal is post_delete:
+        order_id = instance.pk
+        transaction.on_commit(lambda: delete_order_version(order_id))  # id order terhapus gak disimpan lagi
+    else:
+        order_id = instance.pk if sender is Order else instance.order_id
+        transaction.on_commit(lambda: bump_order_version(order_id))
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def publish_live_event(sender, instance, **kwargs):
+    """Kirim event SSE (dashboard & tracking) setelah transaksi commit"""
+    if sender is Order:
+        event_type, order_id, data = 'order', instance.pk, {'status': instance.status}
+    else:
+        event_type, order_id, data = 'item', instance.order_id, {'item_id': instance.pk, 'status': instance.status}
+    transaction.on_commit(lambda: events.publish(event_type, order_id, **data))
+
+
+@receiver(pre_delete, sender=Order)
+def reverse_daily_revenue(sender, instance, **kwargs):
+    """Order lunas dihapus lewat jalur apa pun -> omzetnya dikeluarkan dari DailyRevenue"""
+    instance.cabut_dari_rollup()
+
+
+@receiver(pre_delete, sender=OrderItem)
+def reverse_status_metrics(sender, instance, **kwargs):
+    """Item dihapus (sendiri / ikut order / customer) -> log status-nya dikeluarkan dari rollup metrik"""
+    ItemStatusEvent.keluarkan_dari_rollup([instance.pk])
+
+
+@receiver(post_delete, sender=OrderItem)
+def refresh_order_totals(sender, instance, origin=None, **kwargs):
+    """Item dihapus langsung (bukan ikut kehapus bareng order) -> total order di-update"""
+    origin_model = getattr(origin, 'model', type(origin))
+    if origin_model is not OrderItem:
+        return
+    order = Order.objects.filter(pk=instance.order_id).first()
+    if order:
+        order.refresh_totals()
+
+
+@receiver(post_delete, sender=OrderItem)
+def delete_photo_derivatives(sender, instance, **kwargs):
+    """Item dihapus -> file turunan fotonya ikut dihapus, setelah commit (rollback gak kehilangan file)"""
+    if instance.foto_turunan:
+        foto_turunan = instance.foto_turunan
+        transaction.on_commit(lambda: hapus_turunan_item(foto_turunan))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_role_cache(sender, **kwargs):
+    """Keanggotaan / nama group berubah -> cache role semua user basi"""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_roles_version()
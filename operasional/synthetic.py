@@ -0,0 +1,192 @@
+"""
+Generator data sintetis (pelanggan, order, item, pengeluaran, log status) buat benchmark
+`python manage.py bench` dan test budget query. Semua offline: foto dibuat pakai PIL.
+
+Insert lewat bulk_create (gak lewat save() / signal), lalu kolom turunan diisi manual:
+total order, kolom cari pelanggan, rollup DailyRevenue & metrik pengerjaan di-rebuild.
+"""
+import random
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from .caching import bump_data_version
+from .models import (
+    ACTIVE_STATUSES, SELESAI_STATUSES, Customer, CustomerNamaToken, DailyRevenue, ItemStatusEvent, Order,
+    OrderItem, Pengeluaran, Service, buat_turunan, normalisasi_wa, token_nama,
+)
+
+# Bobot status order: COMPLETED = sudah diambil, sisanya masih di antrian (status semua itemnya)
+DEFAULT_STATUS_MIX = {'PENDING': 4, 'PROCESS': 4, 'READY': 2, 'COMPLETED': 90}
+
+SERVICES = [
+    ('Fast Clean', 25000, 1),
+    ('Deep Clean', 45000, 3),
+    ('Unyellowing', 60000, 4),
+    ('Repaint', 120000, 7),
+    ('Reglue', 50000, 3),
+    ('Premium Treatment', 85000, 5),
+]
+MERK = ['Nike', 'Adidas', 'Vans', 'Converse', 'New Balance', 'Puma', 'Compass', 'Ventela']
+WARNA = ['Putih', 'Hitam', 'Abu', 'Merah', 'Navy', 'Cream']
+NAMA = ['Budi', 'Siti', 'Andi', 'Dewi', 'Rizky', 'Putri', 'Agus', 'Wayan', 'Komang', 'Made', 'Nyoman', 'Ketut']
+PENGELUARAN = [
+    ('BAHAN', 'Sabun', 'Sabun sepatu'), ('BAHAN', 'Cat', 'Cat repaint'), ('OPERASIONAL', 'Listrik', 'Token listrik'),
+    ('OPERASIONAL', 'Bensin', 'Bensin antar jemput'), ('MARKETING', 'Iklan', 'Iklan IG'), ('GAJI', None, 'Gaji teknisi'),
+]
+BATCH_SIZE = 1000
+
+
+def parse_status_mix(teks):
+    """'PENDING=5,PROCESS=5,READY=5,COMPLETED=85' -> dict bobot"""
+    mix = {}
+    for bagian in filter(None, (teks or '').split(',')):
+        status, _, bobot = bagian.partition('=')
+        status = status.strip().upper()
+        if status not in dict(OrderItem.STATUS_CHOICES):
+            raise ValueError(f'Status tidak dikenal: {status}')
+        mix[status] = float(bobot)
+    return mix or dict(DEFAULT_STATUS_MIX)
+
+
+def buat_foto_sintetis(jumlah, rng):
+    """Foto JPEG palsu (gradasi + noise) di storage + turunan srcset-nya. Return list (nama, turunan)"""
+    hasil = []
+    field = OrderItem._meta.get_field('foto_sebelum')
+    for i in range(jumlah):
+        warna = tuple(rng.randrange(256) for _ in range(3))
+        im = Image.new('RGB', (1000, 750), warna)
+        im.paste(Image.effect_noise((1000, 375), 30).convert('RGB'), (0, 375))
+        output = BytesIO()
+        im.save(output, format='JPEG', quality=60)
+        nama = field.storage.save(f'foto_sepatu/before/sintetis_{i}.jpg', ContentFile(output.getvalue()))
+        foto = OrderItem(foto_sebelum=nama).foto_sebelum
+        hasil.append((nama, buat_turunan(foto)))
+    return hasil
+
+
+def _waktu_acak(rng, mulai, selesai):
+    return mulai + (selesai - mulai) * rng.random()
+
+
+def generate(customers=500, orders=5000, items_per_order=(1, 3), expenses=1000, years=2,
+             status_mix=None, images=6, seed=1, now=None):
+    """Isi database dengan data sintetis. Return ringkasan jumlah baris per tabel"""
+    rng = random.Random(seed)
+    now = now or timezone.now()
+    awal = now - timezone.timedelta(days=365 * years)
+    status_mix = status_mix or DEFAULT_STATUS_MIX
+    status_list, bobot = zip(*status_mix.items())
+    metode_list = [m for m, _ in Order.PAYMENT_CHOICES]
+
+    fotos = buat_foto_sintetis(images, rng)
+
+    with transaction.atomic():
+        # Dipanggil lagi di DB yang sudah ada isinya: service yang sama dipakai ulang
+        ada = {service.nama: service for service in Service.objects.filter(nama__in=[s[0] for s in SERVICES])}
+        services = [ada[nama] for nama, _, _ in SERVICES if nama in ada] + Service.objects.bulk_create(
+            Service(nama=nama, harga=harga, durasi_hari=durasi) for nama, harga, durasi in SERVICES if nama not in ada
+        )
+
+        pelanggan = []
+        for i in range(customers):
+            nama = f'{rng.choice(NAMA)} {i}'
+            whatsapp = f'08{rng.randrange(10**9, 10**10)}'
+            pelanggan.append(Customer(
+                nama=nama, whatsapp=whatsapp, alamat='Denpasar',
+                whatsapp_normal=normalisasi_wa(whatsapp), nama_cari=nama.casefold(),
+            ))
+        pelanggan = Customer.objects.bulk_create(pelanggan, batch_size=BATCH_SIZE)
+        CustomerNamaToken.objects.bulk_create(
+            (CustomerNamaToken(customer=customer, token=token)
+             for customer in pelanggan for token in token_nama(customer.nama)),
+            batch_size=BATCH_SIZE,
+        )
+
+        # Order + rencana item (item baru bisa di-insert setelah order punya pk)
+        daftar_order, rencana_item = [], []
+        for _ in range(orders):
+            status = rng.choices(status_list, bobot)[0]
+            if status == 'COMPLETED':
+                masuk = _waktu_acak(rng, awal, now - timezone.timedelta(days=1))
+                selesai = min(masuk + timezone.timedelta(hours=rng.uniform(12, 24 * 7)), now)
+            else:
+                # Masih antri: order beberapa minggu terakhir (sebagian sudah telat)
+                masuk = _waktu_acak(rng, now - timezone.timedelta(days=14), now)
+                selesai = None
+            items = [
+                (rng.choice(services), rng.choice(fotos))
+                for _ in range(rng.randint(*items_per_order))
+            ]
+            daftar_order.append(Order(
+                customer=rng.choice(pelanggan),
+                tanggal_masuk=masuk,
+                tanggal_selesai=selesai,
+                status='COMPLETED' if status == 'COMPLETED' else 'PENDING',
+                metode_pembayaran=rng.choice(metode_list),
+                total_harga=sum(service.harga for service, _ in items),
+                jumlah_item=len(items),
+            ))
+            rencana_item.append((status, items))
+        daftar_order = Order.objects.bulk_create(daftar_order, batch_size=BATCH_SIZE)
+
+        daftar_item = []
+        for order, (status, items) in zip(daftar_order, rencana_item):
+            for service, (nama_foto, turunan) in items:
+                if status == 'COMPLETED':
+                    siap = _waktu_acak(rng, order.tanggal_masuk, order.tanggal_selesai)
+                elif status in SELESAI_STATUSES:
+                    siap = _waktu_acak(rng, order.tanggal_masuk, now)
+                else:
+                    siap = None
+                daftar_item.append(OrderItem(
+                    order=order, service=service, merk_sepatu=rng.choice(MERK), warna=rng.choice(WARNA),
+                    foto_sebelum=nama_foto, foto_turunan={'foto_sebelum': turunan},
+                    harga_saat_order=service.harga, status=status, tanggal_selesai_item=siap,
+                    status_sejak=order.tanggal_selesai or siap or order.tanggal_masuk,
+                ))
+        daftar_item = OrderItem.objects.bulk_create(daftar_item, batch_size=BATCH_SIZE)
+
+        # Log status item yang sudah selesai: PENDING -> READY (-> COMPLETED)
+        log = []
+        for item in daftar_item:
+            if item.status not in SELESAI_STATUSES:
+                continue
+            masuk, siap = item.order.tanggal_masuk, item.tanggal_selesai_item
+            log.append(ItemStatusEvent(
+                item=item, status_lama='PENDING', status_baru='READY', waktu=siap,
+                durasi_detik=int((siap - masuk).total_seconds()),
+                turnaround_detik=int((siap - masuk).total_seconds()),
+            ))
+            if item.status == 'COMPLETED':
+                log.append(ItemStatusEvent(
+                    item=item, status_lama='READY', status_baru='COMPLETED', waktu=item.order.tanggal_selesai,
+                    durasi_detik=int((item.order.tanggal_selesai - siap).total_seconds()),
+                ))
+        ItemStatusEvent.objects.bulk_create(log, batch_size=BATCH_SIZE)
+
+        pengeluaran = []
+        for _ in range(expenses):
+            kategori, sub_kategori, nama = rng.choice(PENGELUARAN)
+            pengeluaran.append(Pengeluaran(
+                nama_pengeluaran=nama, kategori=kategori, sub_kategori=sub_kategori,
+                biaya=rng.randrange(10, 500) * 1000, tanggal=_waktu_acak(rng, awal, now),
+            ))
+        Pengeluaran.objects.bulk_create(pengeluaran, batch_size=BATCH_SIZE)
+
+        DailyRevenue.rebuild()
+        ItemStatusEvent.rebuild_metrics()
+    bump_data_version()
+
+    return {
+        'customers': len(pelanggan),
+        'orders': len(daftar_order),
+        'active_orders': sum(1 for status, _ in rencana_item if status in ACTIVE_STATUSES),
+        'items': len(daftar_item),
+        'status_events': len(log),
+        'expenses': len(pengeluaran),
+        'images': len(fotos),
+    }
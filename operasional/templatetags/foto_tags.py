@@ -0,0 +1,31 @@
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def foto_srcset(item, field, sizes, css_class='', alt=''):
+    """
+    <picture> foto item pakai versi kecil (WebP, fallback JPEG) sesuai `sizes`.
+    Contoh: {% foto_srcset item 'foto_sebelum' '40px' 'w-10 h-10 object-cover' %}
+    Kalau turunan belum dibuat (foto masih diproses), pakai file utama.
+    """
+    foto = getattr(item, field)
+    if not foto:
+        return ''
+
+    turunan = item.turunan(field)
+    if not turunan:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="lazy" decoding="async">', foto.url, css_class, alt
+        )
+
+    url = foto.storage.url
+    srcset_webp = ', '.join(f"{url(v['webp'])} {v['lebar']}w" for v in turunan['varian'])
+    srcset_jpeg = ', '.join(f"{url(v['jpeg'])} {v['lebar']}w" for v in turunan['varian'])
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="lazy" decoding="async"></picture>',
+        srcset_webp, sizes, foto.url, srcset_jpeg, sizes, css_class, alt,
+    )
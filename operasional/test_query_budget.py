@@ -0,0 +1,183 @@
+"""
+Budget query per URL (operasional/urls.py): jumlah query gak boleh ikut naik waktu data bertambah.
+
+Tiap URL diukur 2x: di fixture kecil, lalu setelah data ditambah (order lebih banyak,
+item per order lebih banyak, pengeluaran & log status lebih banyak). Default-nya jumlah
+query harus sama persis; URL yang jumlahnya boleh beda sedikit (lunasi_order: baris rollup
+DailyRevenue baru vs sudah ada) gak boleh lewat `budget`, dipatok ke hasil ukur + selisihnya. Gagal -> SQL yang berulang ikut dicetak.
+"""
+import re
+import shutil
+import tempfile
+from collections import Counter
+from io import BytesIO
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from . import urls
+from .models import ACTIVE_STATUSES, Customer, Order, Service
+from .synthetic import generate
+
+KECIL = dict(customers=20, orders=30, items_per_order=(1, 2), expenses=20, images=1, seed=1)
+BESAR = dict(customers=80, orders=120, items_per_order=(3, 5), expenses=120, images=1, seed=2)
+
+
+class Case:
+    """
+    1 request yang diukur: path(ctx) & data(ctx) dibuat dari context() tiap ukuran.
+    budget None = jumlah query harus konstan
+    """
+    def __init__(self, url_name, path, method='get', data=None, login=True, budget=None):
+        self.url_name = url_name
+        self.path = path
+        self.method = method
+        self.data = data
+        self.login = login
+        self.budget = budget
+
+
+# lunasi_order: 23 query kalau baris DailyRevenue (hari ini, CASH) sudah ada, + get_or_create
+# yang membuat baris baru (SAVEPOINT, INSERT, RELEASE) kalau belum
+LUNASI_ORDER_QUERIES = 23
+DAILY_REVENUE_BARIS_BARU = 3
+
+
+def foto_upload():
+    output = BytesIO()
+    Image.new('RGB', (64, 48), 'white').save(output, format='JPEG')
+    return SimpleUploadedFile('sepatu.jpg', output.getvalue(), content_type='image/jpeg')
+
+
+CASES = [
+    Case('login', lambda ctx: reverse('login'), login=False),
+    Case('login', lambda ctx: reverse('login'), 'post',
+         lambda ctx: {'username': 'budget', 'password': 'budget'}, login=False),
+    Case('logout', lambda ctx: reverse('logout')),
+    Case('dashboard', lambda ctx: reverse('dashboard')),
+    Case('dashboard', lambda ctx: reverse('dashboard') + '?lane=OVERDUE'),
+    Case('dashboard', lambda ctx: reverse('dashboard') + f"?fragment=1&order={ctx['aktif'].pk}"),
+    Case('dashboard_events', lambda ctx: reverse('dashboard_events')),
+    Case('bulk_status_order', lambda ctx: reverse('bulk_status_order'), 'post',
+         lambda ctx: {'order_ids': ctx['aktif_ids'], 'status': 'PROCESS'}),
+    Case('tambah_order', lambda ctx: reverse('tambah_order')),
+    Case('tambah_order', lambda ctx: reverse('tambah_order'), 'post', lambda ctx: {
+        'customer_id': ctx['customer'].pk,
+        **{f'orderitem_set-{i}-service': ctx['service'].pk for i in range(2)},
+        **{f'orderitem_set-{i}-foto_sebelum': foto_upload() for i in range(2)},
+    }),
+    Case('detail_order', lambda ctx: reverse('detail_order', args=[ctx['aktif'].pk])),
+    Case('detail_order', lambda ctx: reverse('detail_order', args=[ctx['aktif'].pk]), 'post',
+         lambda ctx: {f'status_item_{pk}': 'READY' for pk in ctx['aktif_item_ids']}),
+    Case('track_order', lambda ctx: reverse('track_order', args=[ctx['aktif'].pk]), login=False),
+    Case('track_order_status', lambda ctx: reverse('track_order_status', args=[ctx['aktif'].pk]), login=False),
+    Case('track_order_events', lambda ctx: reverse('track_order_events', args=[ctx['aktif'].pk]), login=False),
+    Case('cetak_struk', lambda ctx: reverse('cetak_struk', args=[ctx['aktif'].pk])),
+    Case('qr_order', lambda ctx: reverse('qr_order', args=[ctx['aktif'].pk, 'svg'])),
+    Case('tambah_customer', lambda ctx: reverse('tambah_customer')),
+    Case('analytics', lambda ctx: reverse('analytics') + '?filter=all'),
+    Case('analytics', lambda ctx: reverse('analytics') + '?filter=month'),
+    Case('api_analytics_data', lambda ctx: reverse('api_analytics_data') + '?filter=month'),
+    Case('api_turnaround_data', lambda ctx: reverse('api_turnaround_data') + '?filter=all'),
+    Case('api_customer_search', lambda ctx: reverse('api_customer_search') + '?q=a'),
+    Case('lunasi_order', lambda ctx: reverse('lunasi_order', args=[ctx['aktif'].pk]), 'post',
+         lambda ctx: {'metode_pembayaran': 'CASH'}, budget=LUNASI_ORDER_QUERIES + DAILY_REVENUE_BARIS_BARU),
+    Case('profiling_report', lambda ctx: reverse('profiling_report')),
+]
+
+
+def sql_berulang(queries, batas=10):
+    """SQL yang dijalankan >1x (angka & string literal disamakan) -> teks buat pesan gagal"""
+    pola = Counter(
+        re.sub(r"'[^']*'|\b\d+\b", '?', q['sql'])
+        for q in queries
+    )
+    berulang = [(jumlah, sql) for sql, jumlah in pola.most_common(batas) if jumlah > 1]
+    if not berulang:
+        return 'Tidak ada SQL berulang. Semua query:\n' + '\n'.join(q['sql'] for q in queries)
+    return 'SQL berulang:\n' + '\n'.join(f'{jumlah}x  {sql}' for jumlah, sql in berulang)
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('budget', password='budget')
+        for nama in ('Admin', 'Supervisor', 'Teknisi'):
+            self.user.groups.add(Group.objects.get_or_create(name=nama)[0])
+
+    def context(self):
+        """Target URL: order aktif dengan item terbanyak (biar N+1 per item kelihatan)"""
+        aktif = (
+            Order.objects.filter(items__status__in=ACTIVE_STATUSES)
+            .order_by('-jumlah_item', '-pk').distinct().first()
+        )
+        aktif_ids = list(
+            Order.objects.filter(items__status__in=['PENDING'])
+            .order_by('-jumlah_item', '-pk').values_list('pk', flat=True).distinct()[:5]
+        )
+        return {
+            'aktif': aktif,
+            'aktif_item_ids': list(aktif.items.values_list('pk', flat=True)),
+            'aktif_ids': aktif_ids,
+            'customer': Customer.objects.order_by('-pk').first(),
+            'service': Service.objects.order_by('pk').first(),
+        }
+
+    def ukur(self, case, ctx):
+        if case.login:
+            self.client.force_login(self.user)
+        else:
+            self.client.logout()
+        path = case.path(ctx)
+        data = case.data(ctx) if case.data else None
+        # Tiap ukuran diukur dingin: cache render / versi / role dikosongkan dulu
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, case.method)(path, data)
+        self.assertLess(response.status_code, 400, f'{case.method.upper()} {path} -> {response.status_code}')
+        return queries.captured_queries
+
+    def test_query_count_does_not_grow_with_data(self):
+        generate(**KECIL)
+        ctx = self.context()
+        kecil = [self.ukur(case, ctx) for case in CASES]
+
+        generate(**BESAR)
+        ctx = self.context()
+        besar = [self.ukur(case, ctx) for case in CASES]
+
+        for case, q_kecil, q_besar in zip(CASES, kecil, besar):
+            with self.subTest(url=case.url_name, method=case.method, path=case.path(ctx)):
+                if case.budget is None:
+                    self.assertEqual(
+                        len(q_besar), len(q_kecil),
+                        f'{len(q_kecil)} query di data kecil jadi {len(q_besar)} di data besar.\n'
+                        + sql_berulang(q_besar),
+                    )
+                for queries in (q_kecil, q_besar):
+                    self.assertLessEqual(
+                        len(queries), case.budget or len(q_kecil),
+                        f'Lewat budget {case.budget}.\n' + sql_berulang(queries),
+                    )
+
+    def test_every_url_has_a_budget(self):
+        semua = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(semua - {case.url_name for case in CASES}, set())
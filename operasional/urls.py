@@ -10,12 +10,20 @@ urlpatterns = [
     
     # Main Routes
     path('', views.dashboard, name='dashboard'),
+    path('events/', views.dashboard_events, name='dashboard_events'),
+    path('order/bulk-status/', views.bulk_status_order, name='bulk_status_order'),
     path('tambah/', views.tambah_order, name='tambah_order'),
     path('order/<int:order_id>/', views.detail_order, name='detail_order'),
     path('track/<int:order_id>/', views.track_order, name='track_order'),
+    path('track/<int:order_id>/status.json', views.track_order_status, name='track_order_status'),
+    path('track/<int:order_id>/events/', views.track_order_events, name='track_order_events'),
     path('order/<int:order_id>/print/', views.cetak_struk, name='cetak_struk'),
+    path('order/<int:order_id>/qr.<str:fmt>', views.qr_order, name='qr_order'),
     path('customer/new/', views.tambah_customer, name='tambah_customer'),
     path('analytics/', views.analytics, name='analytics'),
     path('api/analytics/data/', api_analytics_data, name='api_analytics_data'),
+    path('api/analytics/turnaround/', views.api_turnaround_data, name='api_turnaround_data'),
+    path('api/customers/search/', views.api_customer_search, name='api_customer_search'),
     path('order/<int:order_id>/lunasi/', lunasi_order, name='lunasi_order'),
+    path('profiling/', views.profiling_report, name='profiling_report'),
 ]
\ No newline at end of file
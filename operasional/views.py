@@ -1,21 +1,34 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Order, Customer, OrderItem, Service
+from django.template.loader import render_to_string
+from .models import Order, Customer, OrderItem, Service, QUEUE_LANES
 from .forms import CustomerForm, OrderItemForm
 from django.contrib import messages
-from django.db.models import Sum, Count
+from django.db import transaction
 from django.utils import timezone
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+import hashlib
+import json
 import datetime
-import qrcode # <-- Tambahan
-from io import BytesIO # <-- Tambahan
-import base64 # <-- Tambahan
+import logging
 from django.urls import reverse
 from .forms import PengeluaranForm
-from .models import Pengeluaran
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import Group
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import AuthenticationForm
+from .caching import data_version, init_order_version, order_version
+from .ratelimit import ratelimit
+from .roles import can_add_order, is_admin, is_supervisor, is_teknisi
+from .qr import QR_FORMATS, qr_etag, qr_image
+from . import analytics as engine
+from . import events, profiling
+
+logger = logging.getLogger(__name__)
 
 # ==========================================
 # AUTHENTICATION VIEWS (LOGIN/LOGOUT)
@@ -55,33 +68,113 @@ def user_logout(request):
     return redirect('login')
 
 # ==========================================
-# RBAC HELPER FUNCTIONS
+# 1. DASHBOARD OPERASIONAL (Teknisi/Kasir)
 # ==========================================
-def is_admin(user):
-    """Check if user is in Admin group"""
-    return user.is_staff or user.groups.filter(name='Admin').exists()
+DASHBOARD_PAGE_SIZE = 24
+
+def _encode_cursor(order):
+    """Cursor keyset = posisi order terakhir di halaman: '<tanggal_masuk ISO>|<id>'"""
+    return f'{order.tanggal_masuk.isoformat()}|{order.id}'
+
+def _decode_cursor(cursor):
+    """Return (tanggal_masuk, id) atau None kalau cursor kosong / rusak"""
+    try:
+        tanggal, order_id = cursor.rsplit('|', 1)
+        tanggal_masuk = datetime.datetime.fromisoformat(tanggal)
+        if timezone.is_naive(tanggal_masuk):
+            return None
+        return tanggal_masuk, int(order_id)
+    except (AttributeError, ValueError):
+        return None
+
+@login_required
+def dashboard(request):
+    # Tampilkan order yang punya item dengan status BUKAN COMPLETED
+    # Urutkan dari order terbaru. Status, deadline & overdue dihitung di SQL (1 query)
+    lane = request.GET.get('lane', '').upper()
+    if lane not in QUEUE_LANES:
+        lane = ''
+
+    queue = Order.objects.active_queue()
+    orders = queue.lane(lane).prefetch_related('items__service')
+
+    # Live update: kartu 1 order saja (kosong = order sudah keluar dari antrian/lane ini)
+    if request.GET.get('fragment') and request.GET.get('order', '').isdigit():
+        return render(request, 'dashboard_cards.html', {'orders': orders.filter(pk=request.GET['order'])})
+
+    # Keyset pagination: ambil 1 lebih buat tau masih ada halaman berikutnya
+    cursor = _decode_cursor(request.GET.get('cursor'))
+    if cursor:
+        orders = orders.after_cursor(*cursor)
+    orders = list(orders[:DASHBOARD_PAGE_SIZE + 1])
+    has_next = len(orders) > DASHBOARD_PAGE_SIZE
+    orders = orders[:DASHBOARD_PAGE_SIZE]
+    next_cursor = _encode_cursor(orders[-1]) if has_next else ''
+
+    # "Load more": cukup kirim potongan kartu berikutnya
+    if request.GET.get('fragment'):
+        response = render(request, 'dashboard_cards.html', {'orders': orders})
+        response['X-Next-Cursor'] = next_cursor
+        return response
+
+    return render(request, 'dashboard.html', {
+        'orders': orders,
+        'lane': lane,
+        'lane_counts': queue.lane_counts(),
+        'next_cursor': next_cursor,
+    })
 
-def is_supervisor(user):
-    """Check if user is in Supervisor group"""
-    return user.groups.filter(name__in=['Supervisor', 'Admin']).exists()
+# Aksi massal dashboard: centang beberapa order -> semua item aktifnya pindah status
+BULK_STATUS_TARGETS = {'PROCESS', 'READY'}
 
-def is_teknisi(user):
-    """Check if user is in Teknisi group"""
-    return user.groups.filter(name__in=['Teknisi', 'Admin']).exists()
+@login_required
+def bulk_status_order(request):
+    if request.method != 'POST':
+        return redirect('dashboard')
+    if not (is_teknisi(request.user) or is_admin(request.user)):
+        messages.error(request, '⚠️ Anda tidak memiliki akses untuk mengubah status sepatu.')
+        return redirect('dashboard')
 
-def can_add_order(user):
-    """Supervisor, Teknisi or Admin can add orders"""
-    return is_admin(user) or is_supervisor(user) or is_teknisi(user)
+    status = request.POST.get('status')
+    order_ids = [pk for pk in request.POST.getlist('order_ids') if pk.isdigit()]
+    if status not in BULK_STATUS_TARGETS or not order_ids:
+        messages.error(request, '⚠️ Pilih order dan status tujuan dulu.')
+    else:
+        jumlah = Order.objects.filter(pk__in=order_ids).ubah_status_item(status, oleh=request.user)
+        label = dict(OrderItem.STATUS_CHOICES)[status]
+        messages.success(request, f'✅ {jumlah} sepatu dari {len(order_ids)} order jadi "{label}".')
+
+    lane = request.POST.get('lane', '')
+    return redirect(f"{reverse('dashboard')}?lane={lane}" if lane in QUEUE_LANES else 'dashboard')
 
 # ==========================================
-# 1. DASHBOARD OPERASIONAL (Teknisi/Kasir)
+# 1b. LIVE UPDATE (SSE, butuh server ASGI)
 # ==========================================
-@login_required
-def dashboard(request):
-    # Tampilkan order yang punya item dengan status BUKAN COMPLETED
-    # Urutkan dari order terbaru
-    orders = Order.objects.filter(items__status__in=['PENDING', 'PROCESS', 'READY']).distinct().order_by('-tanggal_masuk')
-    return render(request, 'dashboard.html', {'orders': orders})
+def _sse_response(request, channels):
+    # Di WSGI (runserver biasa) stream async bakal ditahan sampai selesai:
+    # 204 bikin EventSource berhenti connect ulang, halaman tetap jalan tanpa live update
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(events.stream(channels), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: jangan di-buffer
+    return response
+
+
+async def dashboard_events(request):
+    """Stream event order/item buat dashboard (login wajib)"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=403)
+    return _sse_response(request, {'dashboard'})
+
+
+@ratelimit('track')
+async def track_order_events(request, order_id):
+    """Stream event 1 order buat halaman tracking publik (id acak gak dapat slot subscriber)"""
+    if not await Order.objects.filter(pk=order_id).aexists():
+        raise Http404('Order tidak ditemukan')
+    return _sse_response(request, {f'order:{order_id}'})
 
 # ==========================================
 # 2. DASHBOARD ANALYTICS (Supervisor/Admin)
@@ -89,156 +182,18 @@ def dashboard(request):
 @login_required
 @user_passes_test(is_supervisor, login_url='dashboard')
 def analytics(request):
-    from django.db.models import Q
-    from datetime import timedelta
-    
-    # 1. GET DATE RANGE FILTER
-    filter_type = request.GET.get('filter', 'all')  # all, today, week, month, custom
-    today = timezone.now().date()
-    
-    # Get custom date range if provided
-    custom_start = request.GET.get('start_date')
-    custom_end = request.GET.get('end_date')
-    
-    if filter_type == 'today':
-        start_date = today
-        end_date = today + timedelta(days=1)
-        filter_label = 'Hari Ini'
-        # For date picker display
-        display_start_date = today.strftime('%Y-%m-%d')
-        display_end_date = today.strftime('%Y-%m-%d')
-    elif filter_type == 'week':
-        start_date = today - timedelta(days=today.weekday())
-        end_date = start_date + timedelta(days=7)
-        filter_label = 'Minggu Ini'
-        # For date picker display
-        display_start_date = start_date.strftime('%Y-%m-%d')
-        display_end_date = (end_date - timedelta(days=1)).strftime('%Y-%m-%d')
-    elif filter_type == 'month':
-        start_date = today.replace(day=1)
-        if today.month == 12:
-            end_date = today.replace(year=today.year+1, month=1, day=1)
-        else:
-            end_date = today.replace(month=today.month+1, day=1)
-        filter_label = f'Bulan {today.strftime("%B %Y")}'
-        # For date picker display
-        display_start_date = start_date.strftime('%Y-%m-%d')
-        display_end_date = (end_date - timedelta(days=1)).strftime('%Y-%m-%d')
-    elif filter_type == 'custom' and custom_start and custom_end:
-        # Custom date range
-        try:
-            from datetime import datetime
-            start_date = datetime.strptime(custom_start, '%Y-%m-%d').date()
-            end_date = datetime.strptime(custom_end, '%Y-%m-%d').date() + timedelta(days=1)
-            filter_label = f'Rentang {start_date.strftime("%d %b %Y")} - {(end_date - timedelta(days=1)).strftime("%d %b %Y")}'
-            # For date picker display
-            display_start_date = custom_start
-            display_end_date = custom_end
-        except:
-            start_date = None
-            end_date = None
-            filter_label = 'Semua Data'
-            display_start_date = today.strftime('%Y-%m-%d')
-            display_end_date = today.strftime('%Y-%m-%d')
-    else:  # all
-        start_date = None
-        end_date = None
-        filter_label = 'Semua Data'
-        display_start_date = today.strftime('%Y-%m-%d')
-        display_end_date = today.strftime('%Y-%m-%d')
-    
-    # 2. Total Pendapatan Kotor (COMPLETED)
-    orders_filter = Order.objects.filter(status='COMPLETED')
-    if start_date and end_date:
-        orders_filter = orders_filter.filter(tanggal_selesai__date__gte=start_date, tanggal_selesai__date__lt=end_date)
-    
-    total_omzet = orders_filter.aggregate(total=Sum('items__service__harga'))['total'] or 0
-
-    # 3. Total Pengeluaran
-    expense_filter = Pengeluaran.objects.all()
-    if start_date and end_date:
-        expense_filter = expense_filter.filter(tanggal__date__gte=start_date, tanggal__date__lt=end_date)
-    
-    total_pengeluaran = expense_filter.aggregate(total=Sum('biaya'))['total'] or 0
-
-    # 4. LABA BERSIH
-    laba_bersih = total_omzet - total_pengeluaran
-
-    # 5. Breakdown Duit (Cash vs Transfer)
-    duit_cash = orders_filter.filter(metode_pembayaran='CASH').aggregate(total=Sum('items__service__harga'))['total'] or 0
-    duit_transfer = orders_filter.filter(metode_pembayaran='TRANSFER').aggregate(total=Sum('items__service__harga'))['total'] or 0
-
-    # 6. BREAKDOWN PENGELUARAN BY KATEGORI
-    breakdown_pengeluaran = expense_filter.values('kategori').annotate(total=Sum('biaya')).order_by('-total')
-    kategori_labels = [item['kategori'] for item in breakdown_pengeluaran]
-    kategori_values = [int(item['total']) if item['total'] else 0 for item in breakdown_pengeluaran]  # Convert ke int
-
-    # 6b. BREAKDOWN PENGELUARAN BY SUB_KATEGORI (with counts)
-    sub_kategori_breakdown = expense_filter.values('sub_kategori').annotate(
-        total=Sum('biaya'),
-        count=Count('id')
-    ).order_by('-count')
-    # Filter out items where sub_kategori is null/empty and calculate average
-    sub_kategori_breakdown_list = []
-    for item in sub_kategori_breakdown:
-        if item['sub_kategori']:
-            item['average'] = int(item['total'] / item['count']) if item['count'] > 0 else 0
-            sub_kategori_breakdown_list.append(item)
-    sub_kategori_breakdown = sub_kategori_breakdown_list
-
-    # 7. TOP SERVICES (Paling sering dipesan)
-    from operasional.models import Service
-    top_services = OrderItem.objects.filter(order__status='COMPLETED')
-    if start_date and end_date:
-        top_services = top_services.filter(order__tanggal_selesai__date__gte=start_date, order__tanggal_selesai__date__lt=end_date)
-    
-    top_services = top_services.values('service__nama').annotate(
-        count=Count('id'),
-        total_revenue=Sum('service__harga')
-    ).order_by('-count')[:5]
-
-    # 8. GROWTH CHART DATA - Respect the selected date range filter
-    # Determine the actual date range for chart/breakdown
-    if start_date and end_date:
-        chart_start_date = start_date
-        chart_end_date = end_date - timedelta(days=1)  # Convert back to inclusive end date
-    else:
-        # For 'all' filter, show last 7 or 30 days
-        if filter_type == 'month':
-            chart_start_date = today - timedelta(days=30)
-        else:
-            chart_start_date = today - timedelta(days=7)
-        chart_end_date = today
-    
-    daily_omzet = []
-    daily_labels = []
-    daily_breakdown = []  # Untuk tabel hari per hari
-    
-    # Calculate number of days between start and end
-    current_date = chart_start_date
-    while current_date <= chart_end_date:
-        day_revenue = Order.objects.filter(
-            status='COMPLETED',
-            tanggal_selesai__date=current_date
-        ).aggregate(total=Sum('items__service__harga'))['total'] or 0
-        
-        # Convert ke int untuk JavaScript
-        daily_omzet.append(int(day_revenue) if day_revenue else 0)
-        daily_labels.append(current_date.strftime('%d %b'))
-        
-        # Breakdown per hari
-        daily_breakdown.append({
-            'tanggal': current_date,
-            'tanggal_format': current_date.strftime('%A, %d %B %Y'),
-            'omzet': int(day_revenue) if day_revenue else 0,
-            'item_count': Order.objects.filter(
-                status='COMPLETED',
-                tanggal_selesai__date=current_date
-            ).aggregate(count=Count('items'))['count'] or 0
-        })
-        current_date += timedelta(days=1)
-
-    # 9. Handle Input Pengeluaran
+    # 1. GET DATE RANGE FILTER (tanggal custom salah -> tampilkan semua data)
+    try:
+        date_range = engine.resolve_date_range(
+            request.GET.get('filter', 'all'),  # all, today, week, month, custom
+            request.GET.get('start_date'),
+            request.GET.get('end_date'),
+        )
+    except ValueError:
+        date_range = engine.resolve_date_range('all')
+    start_date, end_date = date_range['start_date'], date_range['end_date']
+
+    # 2. Handle Input Pengeluaran
     if request.method == 'POST':
         form = PengeluaranForm(request.POST)
         if form.is_valid():
@@ -247,64 +202,58 @@ def analytics(request):
     else:
         form = PengeluaranForm()
 
-    list_pengeluaran = expense_filter.order_by('-tanggal')[:5]
-
-    context = {
-        'total_omzet': total_omzet,
-        'total_pengeluaran': total_pengeluaran,
-        'laba_bersih': laba_bersih,
-        'duit_cash': duit_cash,
-        'duit_transfer': duit_transfer,
-        'form_pengeluaran': form,
-        'list_pengeluaran': list_pengeluaran,
-        'filter_type': filter_type,
-        'filter_label': filter_label,
-        # Breakdown data
-        'kategori_labels': kategori_labels,
-        'kategori_values': kategori_values,
-        'sub_kategori_breakdown': sub_kategori_breakdown,
-        # Top services
-        'top_services': top_services,
+    # 3. KPI + breakdown (omzet 1 query, pengeluaran 1 query)
+    summary = engine.financial_summary(start_date, end_date)
+    daily_breakdown = engine.daily_series(date_range)
+
+    context = dict(
+        summary,
+        form_pengeluaran=form,
+        list_pengeluaran=engine.expense_history(start_date, end_date),
+        filter_type=date_range['filter_type'],
+        filter_label=date_range['filter_label'],
+        sub_kategori_breakdown=engine.sub_kategori_breakdown(start_date, end_date),
+        top_services=engine.top_services(start_date, end_date),
         # Growth chart
-        'daily_labels': daily_labels,
-        'daily_omzet': daily_omzet,
+        daily_labels=[day['label'] for day in daily_breakdown],
+        daily_omzet=[day['omzet'] for day in daily_breakdown],
         # Date picker values - ALWAYS synced with current filter
-        'display_start_date': display_start_date,
-        'display_end_date': display_end_date,
+        display_start_date=date_range['display_start_date'],
+        display_end_date=date_range['display_end_date'],
         # Daily breakdown
-        'daily_breakdown': daily_breakdown,
-    }
+        daily_breakdown=daily_breakdown,
+        # Metrik pengerjaan (rollup log status item)
+        metrik=engine.turnaround_summary(start_date, end_date),
+    )
     return render(request, 'analytics.html', context)
 
 # ==========================================
 # 3. INPUT ORDER (Strict Dropdown)
 # ==========================================
+def _render_tambah_order(request, customer=None):
+    # Pelanggan gak di-render semua, dipilih lewat api_customer_search
+    return render(request, 'tambah_order.html', {
+        'selected_customer': customer,
+        'services': Service.objects.all()
+    })
+
 @login_required
 @user_passes_test(can_add_order, login_url='dashboard')
 def tambah_order(request):
-    # Ambil data customer buat dropdown, urutkan dari member terbaru
-    customers = Customer.objects.all().order_by('-join_date')
-
     if request.method == 'POST':
-        # Ambil ID Customer dari Dropdown
+        # Ambil ID Customer dari kolom pencarian (typeahead)
         customer_id = request.POST.get('customer_id')
 
         # VALIDASI: Wajib pilih pelanggan
         if not customer_id:
             messages.error(request, '⚠️ Wajib pilih pelanggan! Jika belum ada, klik tombol "+ Pelanggan Baru".')
-            return render(request, 'tambah_order.html', {
-                'customers': customers,
-                'services': Service.objects.all()
-            })
+            return _render_tambah_order(request)
 
         try:
             customer = get_object_or_404(Customer, id=customer_id)
             
-            # 1. Buat Order Baru
-            order = Order.objects.create(customer=customer)
-            
-            # 2. Proses Multiple Items dari Formset
-            items_added = 0
+            # 1. Kumpulkan Multiple Items dari Formset
+            rows = []
             
             # Loop semua field yang ada di request
             for key in request.POST.keys():
@@ -322,51 +271,54 @@ def tambah_order(request):
                         
                         # Ambil data dari form
                         service_id = request.POST.get(f'orderitem_set-{i}-service')
-                        merk_sepatu = request.POST.get(f'orderitem_set-{i}-merk_sepatu', '').strip()
-                        warna = request.POST.get(f'orderitem_set-{i}-warna', '').strip()
-                        catatan = request.POST.get(f'orderitem_set-{i}-catatan', '').strip()
                         foto_sebelum = request.FILES.get(f'orderitem_set-{i}-foto_sebelum')
                         
                         # Validasi: minimal ada service dan foto
                         if service_id and foto_sebelum:
-                            service = get_object_or_404(Service, id=service_id)
-                            
-                            # Buat OrderItem
-                            item = OrderItem.objects.create(
-                                order=order,
-                                service=service,
-                                merk_sepatu=merk_sepatu or 'N/A',
-                                warna=warna or 'N/A',
-                                catatan=catatan,
-                                foto_sebelum=foto_sebelum
-                            )
-                            items_added += 1
+                            rows.append((i, int(service_id), foto_sebelum))
             
             # Validasi: minimal ada 1 item
-            if items_added == 0:
-                order.delete()  # Hapus order yang kosong
+            if not rows:
                 messages.error(request, '⚠️ Setiap sepatu WAJIB ada foto! Cek kembali input Anda.')
-                return render(request, 'tambah_order.html', {
-                    'customers': customers,
-                    'services': Service.objects.all()
-                })
+                return _render_tambah_order(request, customer)
+            
+            # 2. Semua service sekali query
+            service_ids = {service_id for _, service_id, _ in rows}
+            services = Service.objects.in_bulk(service_ids)
+            if len(services) != len(service_ids):
+                raise Service.DoesNotExist('Service tidak ditemukan')
+            
+            items = [
+                OrderItem(
+                    service=services[service_id],
+                    merk_sepatu=request.POST.get(f'orderitem_set-{i}-merk_sepatu', '').strip() or 'N/A',
+                    warna=request.POST.get(f'orderitem_set-{i}-warna', '').strip() or 'N/A',
+                    catatan=request.POST.get(f'orderitem_set-{i}-catatan', '').strip(),
+                    foto_sebelum=foto_sebelum
+                )
+                for i, service_id, foto_sebelum in rows
+            ]
+            
+            # 3. Order + semua item: masuk semua atau gak sama sekali
+            with transaction.atomic():
+                order = Order.objects.create(customer=customer)
+                OrderItem.tambah_banyak(order, items)
+            items_added = len(items)
             
             messages.success(request, f'✅ Order berhasil disimpan! ({items_added} item)')
             return redirect('dashboard')
         
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception('Gagal menyimpan order customer %s', customer_id)
             messages.error(request, f'❌ Error: {str(e)}')
-            return render(request, 'tambah_order.html', {
-                'customers': customers,
-                'services': Service.objects.all()
-            })
+            customer = Customer.objects.filter(pk=customer_id).first() if customer_id.isdigit() else None
+            return _render_tambah_order(request, customer)
     
-    return render(request, 'tambah_order.html', {
-        'customers': customers,
-        'services': Service.objects.all()
-    })
+    # Habis daftar pelanggan baru: langsung terpilih (?customer=<id>)
+    customer = None
+    if request.GET.get('customer', '').isdigit():
+        customer = Customer.objects.filter(pk=request.GET['customer']).first()
+    return _render_tambah_order(request, customer)
 
 # ==========================================
 # 4. TAMBAH PELANGGAN BARU
@@ -377,9 +329,9 @@ def tambah_customer(request):
     if request.method == 'POST':
         form = CustomerForm(request.POST)
         if form.is_valid():
-            form.save()
-            messages.success(request, 'Pelanggan berhasil didaftarkan! Silakan pilih di dropdown.')
-            return redirect('tambah_order')
+            customer = form.save()
+            messages.success(request, 'Pelanggan berhasil didaftarkan! Silakan lanjut input order.')
+            return redirect(f"{reverse('tambah_order')}?customer={customer.pk}")
     else:
         form = CustomerForm()
 
@@ -390,12 +342,10 @@ def tambah_customer(request):
 # ==========================================
 @login_required
 def detail_order(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
+    order = get_object_or_404(Order.objects.with_items(), id=order_id)
     
-    # Hitung total belanja buat ditampilkan/dikirim ke WA
-    total_belanja = 0
-    for item in order.items.all():
-        total_belanja += item.service.harga
+    # Total belanja buat ditampilkan/dikirim ke WA (kolom tersimpan, tanpa loop)
+    total_belanja = order.total_harga
 
     if request.method == 'POST':
         # Only teknisi or admin may perform status/photo updates
@@ -403,24 +353,20 @@ def detail_order(request, order_id):
             messages.error(request, '⚠️ Anda tidak memiliki akses untuk mengubah status sepatu.')
             return redirect('detail_order', order_id=order.id)
 
-        # A. UPDATE STATUS PER ITEM (Sepatu)
-        for item in order.items.all():
-            status_key = f'status_item_{item.id}'
-            status_baru = request.POST.get(status_key)
-            
-            if status_baru:
-                item.status = status_baru
-                
-                # Catat waktu selesai kalau status READY/COMPLETED
-                if status_baru in ['READY', 'COMPLETED']:
-                    item.tanggal_selesai_item = timezone.now()
-                else:
-                    item.tanggal_selesai_item = None
-                
-                item.save()
-            
-        # B. UPDATE FOTO AFTER
-        for item in order.items.all():
+        # A. UPDATE STATUS PER ITEM (Sepatu): 1 UPDATE per status tujuan
+        # (tanggal_selesai_item ikut diisi / dikosongkan di statement yang sama)
+        items = order.items.all()  # sudah di-prefetch with_items()
+        status_valid = dict(OrderItem.STATUS_CHOICES)
+        perubahan = {
+            item.id: request.POST[f'status_item_{item.id}']
+            for item in items
+            if request.POST.get(f'status_item_{item.id}') in status_valid
+            and request.POST[f'status_item_{item.id}'] != item.status
+        }
+        order.items.ubah_status_banyak(perubahan, oleh=request.user)
+
+        # B. UPDATE FOTO AFTER (cuma item yang ada file-nya)
+        for item in items:
             file_foto = request.FILES.get(f'foto_after_{item.id}') 
             if file_foto:
                 item.foto_sesudah = file_foto
@@ -441,41 +387,102 @@ def detail_order(request, order_id):
 
 @login_required
 def cetak_struk(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    
-    # 1. HITUNG TOTAL HARGA (Logic Baru)
-    total_hitung = 0
-    for item in order.items.all():
-        total_hitung += item.service.harga
+    order = get_object_or_404(Order.objects.with_items(), id=order_id)
     
-    # 2. QR CODE GENERATOR (Tetap kita simpan, siapa tau nanti mau dimunculin lagi)
-    import qrcode
-    from io import BytesIO
-    import base64
+    # 1. TOTAL HARGA (kolom tersimpan, dari harga snapshot tiap item)
+    total_hitung = order.total_harga
     
-    # Public tracking link for customer (no login required)
-    relative_link = reverse('track_order', args=[order.id])
-    link_tracking = request.build_absolute_uri(relative_link)
-    qr = qrcode.QRCode(box_size=4, border=1) # Ukuran dikecilin dikit biar muat
-    qr.add_data(link_tracking)
-    qr.make(fit=True)
-    img = qr.make_image(fill='black', back_color='white')
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-
-    # 3. KIRIM KE HTML
+    # 2. QR CODE: gak di-generate di sini, struk cuma pasang <img> ke qr_order (di-cache)
     return render(request, 'cetak_struk.html', {
         'order': order,
         'total_hitung': total_hitung, # <-- INI YANG DITUNGGU HTML KAMU
-        'qr_code': img_str
     })
 
 
+QR_CACHE_MAX_AGE = 60 * 60 * 24 * 365  # link tracking order gak pernah berubah
+
+@login_required
+def qr_order(request, order_id, fmt):
+    """Gambar QR link tracking order (svg / png) buat struk, boleh disimpan lama di browser"""
+    if fmt not in QR_FORMATS:
+        raise Http404('Format QR tidak dikenal')
+    get_object_or_404(Order.objects.only('id'), id=order_id)
+
+    link_tracking = request.build_absolute_uri(reverse('track_order', args=[order_id]))
+    etag = qr_etag(link_tracking, fmt)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(qr_image(link_tracking, fmt), content_type=QR_FORMATS[fmt])
+        response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=QR_CACHE_MAX_AGE, immutable=True)
+    return response
+
+
+def _track_validators(order_id, variant):
+    """
+    ETag & Last-Modified halaman tracking dari versi order (waktu perubahan terakhir).
+    Key versi belum ada -> order dicek dulu di DB (404 kalau gak ada) baru key-nya dibuat
+    """
+    versi = order_version(order_id)
+    if versi is None:
+        if not Order.objects.filter(pk=order_id).exists():
+            raise Http404('Order tidak ditemukan')
+        versi = init_order_version(order_id)
+    etag = f'"track-{variant}-{order_id}-{versi}"'
+    return versi, etag, versi // 1_000_000_000
+
+
+def _track_response(request, order_id, variant, build):
+    """
+    Respons tracking yang bisa 304 + di-cache per versi order.
+    `build(order)` bikin (isi, content_type) dari order yang sudah di-prefetch.
+    Versi order dibaca dari DB (1 query), jadi cache render per proses (LocMemCache) pun
+    gak pernah kasih halaman / 304 yang basi.
+    """
+    versi, etag, last_modified = _track_validators(order_id, variant)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache_key = f'track:{variant}:{order_id}:{versi}'
+        cached = cache.get(cache_key)
+        if cached is None:
+            order = get_object_or_404(Order.objects.with_items(), id=order_id)
+            cached = build(order)
+            cache.set(cache_key, cached, settings.TRACK_CACHE_TIMEOUT)
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    # Browser selalu revalidasi (status bisa berubah kapan saja), tapi cukup dapat 304
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@ratelimit('track')
 def track_order(request, order_id):
     """Public tracking view for customers (no login required). Read-only."""
-    order = get_object_or_404(Order, id=order_id)
-    return render(request, 'track_order.html', {'order': order})
+    return _track_response(request, order_id, 'html', lambda order: (
+        render_to_string('track_order.html', {'order': order}), 'text/html; charset=utf-8'
+    ))
+
+
+@ratelimit('track')
+def track_order_status(request, order_id):
+    """Versi JSON ringkas halaman tracking, buat polling tanpa render HTML"""
+    def build(order):
+        items = [
+            {
+                'id': item.id,
+                'merk_sepatu': item.merk_sepatu,
+                'service': item.service.nama,
+                'status': item.status,
+                'status_display': item.get_status_display(),
+                'tanggal_selesai_item': item.tanggal_selesai_item.isoformat() if item.tanggal_selesai_item else None,
+            }
+            for item in order.items.all()
+        ]
+        payload = {'order_id': order.id, 'status': order.status, 'items': items}
+        return json.dumps(payload), 'application/json'
+    return _track_response(request, order_id, 'json', build)
 
 # operasional/views.py
 
@@ -491,18 +498,18 @@ def lunasi_order(request, order_id):
         # 2. Ambil data dari Pop-up (Cash atau Transfer?)
         metode = request.POST.get('metode_pembayaran')
         
-        # 3. UPDATE STATUS JADI LUNAS
-        order.status = 'COMPLETED'           # Ubah status
-        order.metode_pembayaran = metode     # Simpan cara bayar
-        order.tanggal_selesai = timezone.now() # Catat jam ambil
-        order.save()                         # Simpan ke database
-        
-        # 4. UPDATE SEMUA ITEMS STATUS JADI COMPLETED (OTOMATIS)
-        current_time = timezone.now()
-        for item in order.items.all():
-            item.status = 'COMPLETED'
-            item.tanggal_selesai_item = current_time
-            item.save()
+        # Order + items + rollup DailyRevenue harus berubah bareng
+        with transaction.atomic():
+            order = get_object_or_404(Order.objects.select_for_update(), id=order_id)
+
+            # 3. UPDATE STATUS JADI LUNAS (Order.save juga update DailyRevenue)
+            order.status = 'COMPLETED'           # Ubah status
+            order.metode_pembayaran = metode     # Simpan cara bayar
+            order.tanggal_selesai = timezone.now() # Catat jam ambil
+            order.save()                         # Simpan ke database
+            
+            # 4. UPDATE SEMUA ITEMS STATUS JADI COMPLETED (OTOMATIS, 1 UPDATE)
+            order.items.ubah_status('COMPLETED', now=order.tanggal_selesai, oleh=request.user)
         
         # 5. Balik lagi ke halaman detail
         return redirect('detail_order', order_id=order.id)
@@ -513,7 +520,6 @@ def lunasi_order(request, order_id):
 # ==========================================
 # 7. JSON API ENDPOINT - Analytics Data
 # ==========================================
-
 @login_required
 @user_passes_test(is_supervisor, login_url='dashboard')
 def api_analytics_data(request):
@@ -524,102 +530,132 @@ def api_analytics_data(request):
     - start_date: YYYY-MM-DD (for custom)
     - end_date: YYYY-MM-DD (for custom)
     """
-    from datetime import timedelta
-    import json
-    
     filter_type = request.GET.get('filter', 'month')
-    custom_start = request.GET.get('start_date')
-    custom_end = request.GET.get('end_date')
-    today = timezone.now().date()
-    
-    # Determine date range
-    if filter_type == 'today':
-        start_date = today
-        end_date = today + timedelta(days=1)
-    elif filter_type == 'week':
-        start_date = today - timedelta(days=today.weekday())
-        end_date = start_date + timedelta(days=7)
-    elif filter_type == 'month':
-        start_date = today.replace(day=1)
-        if today.month == 12:
-            end_date = today.replace(year=today.year+1, month=1, day=1)
-        else:
-            end_date = today.replace(month=today.month+1, day=1)
-    elif filter_type == 'custom' and custom_start and custom_end:
-        try:
-            from datetime import datetime
-            start_date = datetime.strptime(custom_start, '%Y-%m-%d').date()
-            end_date = datetime.strptime(custom_end, '%Y-%m-%d').date() + timedelta(days=1)
-        except:
-            return JsonResponse({'error': 'Invalid date format'}, status=400)
-    else:
+    if filter_type == 'all':
         return JsonResponse({'error': 'Invalid filter'}, status=400)
+    try:
+        date_range = engine.resolve_date_range(
+            filter_type, request.GET.get('start_date'), request.GET.get('end_date')
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    start_date, end_date = date_range['start_date'], date_range['end_date']
     
-    # Calculate chart data
-    chart_start_date = start_date
-    chart_end_date = end_date - timedelta(days=1)
-    
-    daily_omzet = []
-    daily_labels = []
-    
-    current_date = chart_start_date
-    while current_date <= chart_end_date:
-        day_revenue = Order.objects.filter(
-            status='COMPLETED',
-            tanggal_selesai__date=current_date
-        ).aggregate(total=Sum('items__service__harga'))['total'] or 0
-        
-        daily_omzet.append(int(day_revenue) if day_revenue else 0)
-        daily_labels.append(current_date.strftime('%d %b'))
-        current_date += timedelta(days=1)
-    
-    # Breakdown pengeluaran by kategori
-    expense_filter = Pengeluaran.objects.filter(
-        tanggal__date__gte=start_date,
-        tanggal__date__lt=end_date
+    # Cache per rentang tanggal + versi data (versi di DB, naik tiap ada perubahan data)
+    versi = data_version()
+    etag = '"%s"' % hashlib.md5(f'{versi}:{filter_type}:{start_date}:{end_date}'.encode()).hexdigest()
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = f'analytics_api:{versi}:{start_date}:{end_date}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = engine.api_payload(date_range)
+        cache.set(cache_key, payload, settings.ANALYTICS_CACHE_TIMEOUT)
+
+    response = JsonResponse(dict(payload, filter_type=filter_type))
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# ==========================================
+# 7b. JSON API ENDPOINT - Metrik Pengerjaan (turnaround, lama per status, throughput)
+# ==========================================
+@login_required
+@user_passes_test(is_supervisor, login_url='dashboard')
+def api_turnaround_data(request):
+    """
+    Persentil turnaround (order masuk -> item selesai), rata-rata lama per status & item
+    selesai per teknisi. Cuma baca rollup ItemStatusHarian / TurnaroundHarian.
+    Query params sama dengan api_analytics_data (filter: all, today, week, month, custom)
+    """
+    filter_type = request.GET.get('filter', 'month')
+    try:
+        date_range = engine.resolve_date_range(
+            filter_type, request.GET.get('start_date'), request.GET.get('end_date')
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    start_date, end_date = date_range['start_date'], date_range['end_date']
+
+    versi = data_version()
+    etag = '"%s"' % hashlib.md5(f'turnaround:{versi}:{start_date}:{end_date}'.encode()).hexdigest()
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = f'analytics_turnaround:{versi}:{start_date}:{end_date}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = engine.turnaround_summary(start_date, end_date)
+        cache.set(cache_key, payload, settings.ANALYTICS_CACHE_TIMEOUT)
+
+    response = JsonResponse(dict(
+        payload, status='success', filter_type=filter_type,
+        percentiles=list(engine.TURNAROUND_PERCENTILES),
+    ))
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# ==========================================
+# 8. JSON API ENDPOINT - Cari Pelanggan (Typeahead Input Order)
+# ==========================================
+CUSTOMER_SEARCH_PAGE_SIZE = 20
+
+@login_required
+@user_passes_test(can_add_order, login_url='dashboard')
+def api_customer_search(request):
+    """
+    Typeahead pelanggan. Query params:
+    - q: angka = prefix nomor WA (0812.. / 62812.. / +62 812..), selain itu = prefix kata nama (depan / tengah / belakang)
+    - page: halaman (mulai 1), 20 hasil per halaman
+    """
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid page'}, status=400)
+
+    offset = (page - 1) * CUSTOMER_SEARCH_PAGE_SIZE
+    rows = list(
+        Customer.objects.cari(request.GET.get('q'))
+        .values('id', 'nama', 'whatsapp', 'alamat')[offset:offset + CUSTOMER_SEARCH_PAGE_SIZE + 1]
     )
-    breakdown_pengeluaran = expense_filter.values('kategori').annotate(total=Sum('biaya')).order_by('-total')
-    kategori_labels = [item['kategori'] for item in breakdown_pengeluaran]
-    kategori_values = [int(item['total']) if item['total'] else 0 for item in breakdown_pengeluaran]
-    
-    # KPI data
-    orders_filter = Order.objects.filter(status='COMPLETED')
-    orders_filter = orders_filter.filter(tanggal_selesai__date__gte=start_date, tanggal_selesai__date__lt=end_date)
-    
-    total_omzet = orders_filter.aggregate(total=Sum('items__service__harga'))['total'] or 0
-    total_pengeluaran = expense_filter.aggregate(total=Sum('biaya'))['total'] or 0
-    laba_bersih = total_omzet - total_pengeluaran
-    
-    duit_cash = orders_filter.filter(metode_pembayaran='CASH').aggregate(total=Sum('items__service__harga'))['total'] or 0
-    duit_transfer = orders_filter.filter(metode_pembayaran='TRANSFER').aggregate(total=Sum('items__service__harga'))['total'] or 0
-    
-    # Get expense history (5 latest)
-    list_pengeluaran = expense_filter.order_by('-tanggal')[:5]
-    pengeluaran_data = []
-    for expense in list_pengeluaran:
-        pengeluaran_data.append({
-            'tanggal': expense.tanggal.strftime('%d %b'),
-            'nama': expense.nama_pengeluaran,
-            'sub_kategori': expense.sub_kategori or '',
-            'kategori_display': expense.get_kategori_display(),
-            'biaya': int(expense.biaya),
-        })
-    
     return JsonResponse({
-        'status': 'success',
-        'filter_type': filter_type,
-        'kpi': {
-            'total_omzet': int(total_omzet),
-            'total_pengeluaran': int(total_pengeluaran),
-            'laba_bersih': int(laba_bersih),
-            'duit_cash': int(duit_cash),
-            'duit_transfer': int(duit_transfer),
-        },
-        'charts': {
-            'daily_labels': daily_labels,
-            'daily_omzet': daily_omzet,
-            'kategori_labels': kategori_labels,
-            'kategori_values': kategori_values,
-        },
-        'expense_history': pengeluaran_data,
-    })
\ No newline at end of file
+        'results': rows[:CUSTOMER_SEARCH_PAGE_SIZE],
+        'page': page,
+        'has_more': len(rows) > CUSTOMER_SEARCH_PAGE_SIZE,
+    })
+
+
+# ==========================================
+# 9. PROFILING REQUEST (staff) - endpoint paling lambat
+# ==========================================
+@login_required
+@user_passes_test(lambda user: user.is_staff, login_url='dashboard')
+def profiling_report(request):
+    """
+    Ringkasan request terakhir yang dicatat ProfilingMiddleware (per proses, di memori),
+    dikelompokkan per endpoint & diurutkan dari p95 paling lambat.
+    Query param n: cuma n request terakhir (default semua riwayat)
+    """
+    rows = profiling.riwayat()
+    try:
+        n = int(request.GET.get('n', 0))
+    except ValueError:
+        n = 0
+    if n > 0:
+        rows = rows[-n:]
+
+    return render(request, 'profiling.html', {
+        'aktif': settings.PROFILING_ENABLED,
+        'jumlah_request': len(rows),
+        'endpoints': profiling.ringkas_endpoint(rows),
+        'terlambat': sorted(rows, key=lambda row: -row['total_ms'])[:20],
+        'slow_ms': settings.PROFILING_SLOW_MS,
+        'slow_log': settings.PROFILING_SLOW_LOG,
+        'n': n or '',
+    })